@@ -0,0 +1,29 @@
+# DocsMCP Gunicorn Configuration Example
+#
+#   pip install gunicorn uvicorn-worker
+#   gunicorn -c examples/gunicorn.conf.py
+#
+# Each worker is a separate process with its own rate-limit buckets,
+# metrics and scrape semaphore, so limits apply per worker.
+
+import multiprocessing
+import os
+
+# Application (src/ holds main.py and the modules it imports)
+chdir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+wsgi_app = "main:app"
+
+# Server socket
+bind = f"{os.environ.get('HOST', '0.0.0.0')}:{os.environ.get('PORT', '8090')}"
+
+# Workers
+worker_class = "uvicorn_worker.UvicornWorker"
+workers = int(os.environ.get("WORKERS", multiprocessing.cpu_count() * 2 + 1))
+timeout = 120
+graceful_timeout = 30
+keepalive = 5
+
+# Logging
+accesslog = "-"
+errorlog = "-"
+loglevel = os.environ.get("LOG_LEVEL", "info").lower()
@@ -4,7 +4,7 @@ Provides commands for managing documentation projects.
 """
 from __future__ import annotations
 
-import asyncio
+import argparse
 import json
 import sys
 from pathlib import Path
@@ -17,18 +17,19 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from config import settings
 from storage import (
-    list_projects, project_exists, read_json, write_json,
-    config_path, delete_project, get_project_stats, docs_dir,
+    list_projects, project_exists, read_json, read_json_cached,
+    config_path, get_project_stats, ensure_projects_root,
 )
-from scraper import scrape_project
-from fts_indexer import query_fts, build_fts_index, get_fts_stats
+
+# Scraper/indexer modules (and asyncio, httpx, trafilatura, ...) are
+# imported inside the commands that need them to keep startup fast.
 
 
 @click.group()
 @click.version_option(version="1.0.0", prog_name="docsmcp")
 def cli():
     """DocsMCP - Self-hosted documentation search with MCP support."""
-    pass
+    ensure_projects_root()
 
 
 @cli.command()
@@ -57,7 +58,8 @@ def add(
         click.echo(f"Error: Project '{project_id}' already exists.", err=True)
         sys.exit(1)
     
-    from datetime import datetime
+    import asyncio
+    from storage import iso_now, write_json
     
     config = {
         "id": project_id,
@@ -67,7 +69,7 @@ def add(
             "max_pages": max_pages,
         },
         "status": "created",
-        "createdAt": datetime.utcnow().isoformat(),
+        "createdAt": iso_now(),
     }
     
     if include:
@@ -97,11 +99,14 @@ def scrape_cmd(project_id: str, full: bool):
         click.echo(f"Error: Project '{project_id}' not found.", err=True)
         sys.exit(1)
     
+    import asyncio
     asyncio.run(_scrape_project(project_id, clear_existing=full))
 
 
 async def _scrape_project(project_id: str, clear_existing: bool = False):
     """Run scrape with progress output."""
+    from scraper import scrape_project
+    
     config = read_json(config_path(project_id))
     cfg = config.get("config", {})
     
@@ -134,24 +139,20 @@ def search_cmd(query: str, project: Optional[str], limit: int, as_json: bool):
         docsmcp search "useState hook"
         docsmcp search "error handling" -p python
     """
+    _run_search(query, project, limit, as_json)
+
+
+def _run_search(query: str, project: Optional[str], limit: int, as_json: bool):
+    """Search one or all projects and print the merged results."""
+    from search import search_projects
+    
     project_ids = [project] if project else list_projects()
     
     if project and not project_exists(project):
         click.echo(f"Error: Project '{project}' not found.", err=True)
         sys.exit(1)
     
-    all_results = []
-    for pid in project_ids:
-        try:
-            results = query_fts(pid, query, limit)
-            for r in results:
-                r["project"] = pid
-            all_results.extend(results)
-        except Exception:
-            continue
-    
-    all_results.sort(key=lambda x: x.get("score", 0), reverse=True)
-    all_results = all_results[:limit]
+    all_results = search_projects(project_ids, query, limit, vectors=False)
     
     if as_json:
         click.echo(json.dumps(all_results, indent=2))
@@ -163,8 +164,7 @@ def search_cmd(query: str, project: Optional[str], limit: int, as_json: bool):
                 click.echo(f"\n{i}. {r['title']}")
                 click.echo(f"   Project: {r['project']}")
                 click.echo(f"   URL: {r.get('url', 'N/A')}")
-                snippet = r.get('snippet', '').replace('<mark>', '').replace('</mark>', '')
-                click.echo(f"   {snippet[:100]}...")
+                click.echo(f"   {r.get('snippet', '')[:100]}...")
 
 
 @cli.command("list")
@@ -173,7 +173,7 @@ def list_cmd(as_json: bool):
     """List all projects."""
     projects = []
     for project_id in list_projects():
-        config = read_json(config_path(project_id))
+        config = read_json_cached(config_path(project_id))
         stats = get_project_stats(project_id)
         projects.append({
             "id": project_id,
@@ -203,7 +203,9 @@ def status(project_id: str, as_json: bool):
         click.echo(f"Error: Project '{project_id}' not found.", err=True)
         sys.exit(1)
     
-    config = read_json(config_path(project_id))
+    from fts_indexer import get_fts_stats
+    
+    config = read_json_cached(config_path(project_id))
     stats = get_project_stats(project_id)
     fts_stats = get_fts_stats(project_id)
     
@@ -248,6 +250,8 @@ def delete(project_id: str, force: bool):
             abort=True
         )
     
+    from storage import delete_project
+    
     delete_project(project_id)
     click.echo(f"✓ Deleted project '{project_id}'")
 
@@ -287,6 +291,8 @@ def index(project_id: str):
         click.echo(f"Error: Project '{project_id}' not found.", err=True)
         sys.exit(1)
     
+    from fts_indexer import build_fts_index
+    
     click.echo(f"Building FTS index for '{project_id}'...")
     count = build_fts_index(project_id)
     click.echo(f"✓ Indexed {count} documents")
@@ -329,5 +335,40 @@ def show_config(as_json: bool):
             click.echo(f"{k}: {v}")
 
 
-if __name__ == "__main__":
+class _FastArgParser(argparse.ArgumentParser):
+    """ArgumentParser that raises instead of exiting, so Click can take over."""
+    
+    def error(self, message):
+        raise ValueError(message)
+
+
+def _fast_search(argv: list[str]) -> bool:
+    """Run `search` without building the Click command tree.
+    
+    Returns False when the arguments need Click (help, unknown or invalid
+    options) so the caller can fall back to it.
+    """
+    parser = _FastArgParser(prog="docsmcp search", add_help=False, allow_abbrev=False)
+    parser.add_argument("query")
+    parser.add_argument("--project", "-p")
+    parser.add_argument("--limit", "-l", type=int, default=5)
+    parser.add_argument("--json", dest="as_json", action="store_true")
+    try:
+        args = parser.parse_args(argv)
+    except ValueError:
+        return False
+    
+    _run_search(args.query, args.project, args.limit, args.as_json)
+    return True
+
+
+def main():
+    """Console entry point; `search` skips Click's parsing when it can."""
+    argv = sys.argv[1:]
+    if argv and argv[0] == "search" and _fast_search(argv[1:]):
+        return
     cli()
+
+
+if __name__ == "__main__":
+    main()
@@ -10,14 +10,19 @@ from dataclasses import dataclass, field
 from typing import Optional
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Settings:
-    """Application settings loaded from environment."""
+    """Application settings loaded from environment.
+    
+    Environment variables are read once when the instance is created; call
+    reload_settings() to pick up changes.
+    """
     
     # Core
     api_token: str = field(default_factory=lambda: os.environ.get("API_TOKEN", ""))
     host: str = field(default_factory=lambda: os.environ.get("HOST", "0.0.0.0"))
     port: int = field(default_factory=lambda: int(os.environ.get("PORT", "8090")))
+    workers: int = field(default_factory=lambda: int(os.environ.get("WORKERS", "1")))
     data_dir: Path = field(default_factory=lambda: Path(os.environ.get("DATA_DIR", "./data")))
     
     # Search
@@ -28,6 +33,7 @@ class Settings:
     # Scraping
     max_pages_per_project: int = field(default_factory=lambda: int(os.environ.get("MAX_PAGES_PER_PROJECT", "10000")))
     rate_limit_delay: float = field(default_factory=lambda: float(os.environ.get("RATE_LIMIT_DELAY", "1.0")))
+    scrape_concurrency: int = field(default_factory=lambda: int(os.environ.get("SCRAPE_CONCURRENCY", "4")))
     respect_robots_txt: str = field(default_factory=lambda: os.environ.get("RESPECT_ROBOTS_TXT", "permissive"))
     user_agent: str = field(default_factory=lambda: os.environ.get("USER_AGENT", "DocsMCP/1.0"))
     request_timeout: int = field(default_factory=lambda: int(os.environ.get("REQUEST_TIMEOUT", "30")))
@@ -50,14 +56,21 @@ class Settings:
     rate_limit_requests: int = field(default_factory=lambda: int(os.environ.get("RATE_LIMIT_REQUESTS", "100")))
     rate_limit_window: int = field(default_factory=lambda: int(os.environ.get("RATE_LIMIT_WINDOW", "60")))
     
+    # Derived paths
+    _projects_dir: Path = field(init=False, repr=False, compare=False)
+    
     def __post_init__(self):
-        """Ensure data directory exists."""
-        self.data_dir.mkdir(parents=True, exist_ok=True)
+        """Precompute derived paths.
+        
+        Nothing is created on disk here; storage.ensure_projects_root() makes
+        the data directory at startup.
+        """
+        object.__setattr__(self, "_projects_dir", self.data_dir / "projects")
     
     @property
     def projects_dir(self) -> Path:
         """Get projects storage directory."""
-        return self.data_dir / "projects"
+        return self._projects_dir
     
     def validate(self) -> list[str]:
         """Validate settings and return list of errors."""
@@ -72,9 +85,15 @@ class Settings:
         if self.port < 1 or self.port > 65535:
             errors.append(f"PORT must be 1-65535, got {self.port}")
         
+        if self.workers < 1:
+            errors.append(f"WORKERS must be >= 1, got {self.workers}")
+        
         if self.rate_limit_delay < 0.1:
             errors.append(f"RATE_LIMIT_DELAY should be >= 0.1, got {self.rate_limit_delay}")
         
+        if self.scrape_concurrency < 1:
+            errors.append(f"SCRAPE_CONCURRENCY must be >= 1, got {self.scrape_concurrency}")
+        
         if self.respect_robots_txt not in ("strict", "permissive", "ignore"):
             errors.append(f"RESPECT_ROBOTS_TXT must be strict/permissive/ignore, got {self.respect_robots_txt}")
         
@@ -5,16 +5,76 @@ Perfect for low-resource environments where vector search is overkill.
 """
 from __future__ import annotations
 
+import json
+import multiprocessing
+import os
+import random
 import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Any, Dict, Iterator, List, Tuple
 
-from storage import project_dir, docs_dir, fts_db_path
+from config import settings
+from storage import (
+    project_dir, docs_dir, fts_db_path, first_heading, markdown_files, parse_frontmatter,
+)
 
 
 from typing import Optional
 
 
+# Connection-level tuning for index rebuilds. The index is derived data that
+# can always be rebuilt from docs/, so durability is traded for write speed.
+_BULK_LOAD_PRAGMAS = (
+    "PRAGMA synchronous=OFF",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",  # 64 MiB page cache
+    "PRAGMA mmap_size=268435456",  # 256 MiB
+)
+
+# BM25 column weights for (title, content), stored as the table's persistent
+# rank function so matches in titles outrank body-only matches.
+_RANK_FUNCTION = "bm25(10.0, 1.0)"
+
+# Below this many files, worker start-up and pickling cost more than the
+# parse work a process pool would save.
+_PARALLEL_PARSE_MIN_FILES = 256
+
+# Concurrent file reads for the threaded path
+_READ_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Open read connections keyed by db path: (connection, lock, inode). The
+# inode lets us notice a database that was deleted and recreated underneath
+# a cached connection. sqlite releases the GIL while a query runs, so
+# queries against different projects can overlap on threads.
+_CONN_POOL: Dict[str, Tuple[sqlite3.Connection, threading.Lock, int]] = {}
+_CONN_POOL_LOCK = threading.Lock()
+
+# Query result cache. Keys include the index file's inode and its
+# user_version, which every build that changes the index increments, so
+# rebuilds by any process invalidate entries. Results are also stored in a
+# sidecar sqlite file under the data directory so separate CLI runs can
+# share them without ever writing to the index itself.
+_QUERY_CACHE_TTL = 60.0
+_QUERY_CACHE_SIZE = 128
+_QUERY_CACHE: OrderedDict[tuple, Tuple[float, List[Dict[str, Any]]]] = OrderedDict()
+_QUERY_CACHE_LOCK = threading.Lock()
+
+# Sidecar cache connections keyed by file path: [connection, lock, next purge
+# time]. Expired rows are swept at most every _SHARED_CACHE_PURGE_INTERVAL.
+_SHARED_CACHE_FILE = "query_cache.db"
+_SHARED_CACHE_PURGE_INTERVAL = 300.0
+_SHARED_CACHE: Dict[str, list] = {}
+_SHARED_CACHE_LOCK = threading.Lock()
+
+
+# docs_meta row: (path, title, url, content, mtime_ns, size)
+_Row = Tuple[str, str, str, str, int, int]
+
+
 def _paths_for_project(project_id: str, base_dir: Optional[str] = None):
     """Return (db_path, docs_folder) for a project, optionally using a base directory for tests."""
     if base_dir:
@@ -28,82 +88,247 @@ def _paths_for_project(project_id: str, base_dir: Optional[str] = None):
     return db_path, docs_folder
 
 
+def _get_conn(db_path: Path) -> Tuple[sqlite3.Connection, threading.Lock, int]:
+    """Return a cached read connection for db_path, its lock and the file's inode.
+
+    Raises OSError if the database file does not exist.
+    """
+    key = str(db_path)
+    inode = db_path.stat().st_ino
+    with _CONN_POOL_LOCK:
+        entry = _CONN_POOL.get(key)
+        if entry is not None:
+            if entry[2] == inode:
+                return entry
+            with entry[1]:
+                entry[0].close()
+        # Short busy timeout: readers never wait on WAL writers
+        conn = sqlite3.connect(key, timeout=0.25, check_same_thread=False)
+        entry = (conn, threading.Lock(), inode)
+        _CONN_POOL[key] = entry
+        return entry
+
+
+def _close_conn(db_path: Path) -> None:
+    """Close and forget the cached connection for db_path, if any."""
+    with _CONN_POOL_LOCK:
+        entry = _CONN_POOL.pop(str(db_path), None)
+    if entry is not None:
+        with entry[1]:
+            entry[0].close()
+
+
+def _parse_md(md: str) -> Optional[_Row]:
+    """Read one Markdown file into a docs_meta row.
+
+    Module-level so it can be shipped to worker processes.
+    """
+    try:
+        with open(md, "rb") as f:
+            st = os.fstat(f.fileno())
+            text = f.read().decode("utf-8", "ignore")
+    except Exception:
+        return None
+    name = os.path.basename(md)
+    
+    # Frontmatter metadata
+    fm, _ = parse_frontmatter(text)
+    title = fm.get("title")
+    url = fm.get("url") or ""
+    
+    # Fallback title extraction from first heading
+    if not title:
+        title = first_heading(text)
+    
+    if not title:
+        title = name[:-3]
+    
+    return (name, title, url, text, st.st_mtime_ns, st.st_size)
+
+
+def _iter_docs(files: List[str]) -> Iterator[_Row]:
+    """Yield docs_meta rows for the given Markdown files.
+
+    Rows are produced lazily so sqlite can consume them one at a time
+    instead of holding the whole corpus in memory. Files are read on a
+    thread pool, or parsed across a process pool for large batches; sqlite
+    stays the single writer.
+    
+    Builds also run inside the server (after scrapes, and on query-time
+    rebuilds), so workers come from a forkserver rather than forking the
+    multithreaded server process with its threads and held locks.
+    """
+    if len(files) >= _PARALLEL_PARSE_MIN_FILES:
+        workers = os.cpu_count() or 1
+        pool: Executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("forkserver")
+        )
+        chunksize = max(1, len(files) // (workers * 4))
+    else:
+        # File reads release the GIL, so threads still overlap disk I/O
+        pool = ThreadPoolExecutor(max_workers=_READ_WORKERS)
+        chunksize = 1
+    
+    with pool:
+        for row in pool.map(_parse_md, files, chunksize=chunksize):
+            if row:
+                yield row
+
+
+def _has_current_schema(cur: sqlite3.Cursor) -> bool:
+    """Whether the database already has the incremental docs_meta/docs_fts schema."""
+    columns = {row[1] for row in cur.execute("PRAGMA table_info(docs_meta)")}
+    if not {"mtime_ns", "size"} <= columns:
+        return False
+    return cur.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'docs_fts'"
+    ).fetchone() is not None
+
+
+def _create_schema(cur: sqlite3.Cursor) -> None:
+    """Drop any existing index tables and create empty ones."""
+    cur.execute("DROP TABLE IF EXISTS docs_fts")
+    cur.execute("DROP TABLE IF EXISTS docs_meta")
+    
+    # Document rows live in an ordinary table; the FTS table only indexes
+    # title and content and reads them back from docs_meta (external
+    # content) for snippets. mtime_ns/size let later builds skip files that
+    # haven't changed.
+    cur.execute("""
+        CREATE TABLE docs_meta (
+            rowid INTEGER PRIMARY KEY,
+            path TEXT NOT NULL UNIQUE,
+            title TEXT,
+            url TEXT,
+            content TEXT,
+            mtime_ns INTEGER,
+            size INTEGER
+        )
+    """)
+    cur.execute("""
+        CREATE VIRTUAL TABLE docs_fts USING fts5(
+            title,
+            content,
+            content='docs_meta',
+            content_rowid='rowid',
+            tokenize='porter unicode61'
+        )
+    """)
+    cur.execute(
+        "INSERT INTO docs_fts (docs_fts, rank) VALUES ('rank', ?)",
+        (_RANK_FUNCTION,),
+    )
+
+
 def build_fts_index(project_id: str, base_dir: Optional[str] = None) -> int:
-    """Build FTS5 index for a project.
+    """Build or update the FTS5 index for a project.
+    
+    Only files whose mtime or size changed since the last build are
+    re-read; rows for deleted files are removed. The tables are recreated
+    from scratch when the schema is missing or no existing row can be kept.
     
-    Returns the number of documents indexed.
+    Returns the number of documents in the index.
     """
     db_path, docs_folder = _paths_for_project(project_id, base_dir)
     
     if not docs_folder.exists():
         return 0
+    
+    files = markdown_files(docs_folder)
 
-    # Collect documents
-    docs = []
-    for md in sorted(docs_folder.glob("*.md")):
-        try:
-            text = md.read_text(encoding="utf-8", errors="ignore")
-        except Exception:
-            continue
-        
-        # Parse YAML frontmatter for metadata
-        title = None
-        url = ""
+    # Autocommit mode so the whole update runs in one explicit transaction
+    # instead of sqlite3's implicit per-statement ones.
+    conn = sqlite3.connect(str(db_path), isolation_level=None)
+    try:
+        cur = conn.cursor()
+        cur.execute("PRAGMA journal_mode=WAL")
+        for pragma in _BULK_LOAD_PRAGMAS:
+            cur.execute(pragma)
+
+        cur.execute("BEGIN IMMEDIATE")
         
-        if text.startswith("---"):
-            parts = text.split("---", 2)
-            if len(parts) >= 3:
-                import yaml
+        stale: List[int] = []
+        todo = files
+        if _has_current_schema(cur):
+            existing = {
+                path: (rowid, mtime_ns, size)
+                for rowid, path, mtime_ns, size in cur.execute(
+                    "SELECT rowid, path, mtime_ns, size FROM docs_meta"
+                )
+            }
+            todo = []
+            for md in files:
+                name = os.path.basename(md)
+                old = existing.pop(name, None)
                 try:
-                    fm = yaml.safe_load(parts[1])
-                    if fm:
-                        title = fm.get("title")
-                        url = fm.get("url", "")
-                except Exception:
-                    pass
+                    st = os.stat(md)
+                except OSError:
+                    # Vanished mid-scan; drop its row
+                    if old is not None:
+                        stale.append(old[0])
+                    continue
+                if old is not None:
+                    if (old[1], old[2]) == (st.st_mtime_ns, st.st_size):
+                        continue
+                    stale.append(old[0])
+                todo.append(md)
+            # Whatever is left in existing has no file any more
+            stale.extend(rowid for rowid, _, _ in existing.values())
         
-        # Fallback title extraction from first heading
-        if not title:
-            for line in text.splitlines():
-                s = line.strip()
-                if s.startswith("#"):
-                    title = s.lstrip("# ").strip()
-                    break
+        rebuilt = len(todo) == len(files)
+        if rebuilt:
+            # Nothing reusable: a clean rebuild beats row-by-row deletes
+            _create_schema(cur)
+            stale = []
         
-        if not title:
-            title = md.stem
+        if rebuilt or stale or todo:
+            # Invalidates cached query results in every process. A new file
+            # starts at a random version so a recreated index (which may
+            # reuse the old inode) can't match stale cache keys.
+            version = cur.execute("PRAGMA user_version").fetchone()[0]
+            version = version + 1 if version else random.randrange(1, 2**30)
+            cur.execute(f"PRAGMA user_version = {version}")
         
-        docs.append((md.name, title, url, text))
-
-    # Build/replace FTS DB
-    conn = sqlite3.connect(str(db_path))
-    try:
-        cur = conn.cursor()
-        cur.execute("PRAGMA journal_mode=WAL")
-        
-        # Drop and recreate table for clean rebuild
-        cur.execute("DROP TABLE IF EXISTS docs_fts")
+        if stale:
+            # External-content tables need the old values to remove postings
+            cur.executemany(
+                "INSERT INTO docs_fts (docs_fts, rowid, title, content) "
+                "SELECT 'delete', rowid, title, content FROM docs_meta WHERE rowid = ?",
+                ((rowid,) for rowid in stale),
+            )
+            cur.executemany(
+                "DELETE FROM docs_meta WHERE rowid = ?",
+                ((rowid,) for rowid in stale),
+            )
         
-        # Create FTS table (path and url are unindexed - stored only for reference)
-        cur.execute("""
-            CREATE VIRTUAL TABLE docs_fts USING fts5(
-                path UNINDEXED,
-                title,
-                url UNINDEXED,
-                content,
-                tokenize='porter unicode61'
+        if todo:
+            # New rows always get rowids above the current maximum
+            last_rowid = cur.execute(
+                "SELECT COALESCE(MAX(rowid), 0) FROM docs_meta"
+            ).fetchone()[0]
+            cur.executemany(
+                "INSERT INTO docs_meta (path, title, url, content, mtime_ns, size) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                _iter_docs(todo),
+            )
+            cur.execute(
+                "INSERT INTO docs_fts (rowid, title, content) "
+                "SELECT rowid, title, content FROM docs_meta WHERE rowid > ?",
+                (last_rowid,),
             )
-        """)
         
-        cur.executemany(
-            "INSERT INTO docs_fts (path, title, url, content) VALUES (?, ?, ?, ?)",
-            docs
-        )
-        conn.commit()
+        count = cur.execute("SELECT COUNT(*) FROM docs_meta").fetchone()[0]
+        cur.execute("COMMIT")
+        if stale or todo:
+            cur.execute("PRAGMA optimize")
+    except BaseException:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
     finally:
         conn.close()
 
-    return len(docs)
+    return count
 
 
 def query_fts(
@@ -111,6 +336,7 @@ def query_fts(
     query: str,
     top_k: int | str = 10,
     base_dir: Optional[str] = None,
+    highlight: bool = False,
 ) -> List[Dict[str, Any]]:
     # Backwards compatibility: tests pass base_dir as the 3rd positional arg.
     if isinstance(top_k, str) and base_dir is None:
@@ -123,55 +349,198 @@ def query_fts(
     """Query the FTS index.
     
     Returns list of results with title, path, url, snippet, and score.
+    Matched terms in the snippet are wrapped in <mark> tags only when
+    highlight is true.
     """
     db_path, _ = _paths_for_project(project_id, base_dir)
-    if not db_path.exists():
+    
+    # Sanitize query for FTS
+    q = query.replace('"', ' ').replace("'", " ").strip()
+    if not q:
         return []
-
-    conn = sqlite3.connect(str(db_path))
+    
     try:
-        cur = conn.cursor()
-        
-        # Sanitize query for FTS
-        q = query.replace('"', ' ').replace("'", " ").strip()
-        if not q:
-            return []
-        
-        # Use MATCH with bm25 ranking
-        sql = """
-            SELECT 
-                path,
-                title,
-                url,
-                snippet(docs_fts, 3, '<mark>', '</mark>', '...', 64) as snippet,
-                bm25(docs_fts) as score
+        conn, lock, inode = _get_conn(db_path)
+    except OSError:
+        return []
+    
+    with lock:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+    
+    key = (str(db_path), inode, version, q, top_k, highlight)
+    results = _cache_get(key)
+    if results is None:
+        shared = _shared_cache(base_dir)
+        shared_key = json.dumps(key)
+        results = _shared_cache_get(shared, shared_key)
+        if results is None:
+            results = _run_query(project_id, base_dir, conn, lock, q, top_k, highlight)
+            _shared_cache_put(shared, shared_key, results)
+        _cache_put(key, results)
+    
+    # Callers annotate results in place; keep the cached rows untouched
+    return [dict(r) for r in results]
+
+
+def _run_query(
+    project_id: str,
+    base_dir: Optional[str],
+    conn: sqlite3.Connection,
+    lock: threading.Lock,
+    q: str,
+    top_k: int,
+    highlight: bool,
+) -> List[Dict[str, Any]]:
+    """Run a MATCH query against the index and return result dicts."""
+    # Use MATCH with the table's configured bm25 rank function; metadata is
+    # joined in only for the rows that survive the LIMIT.
+    sql = """
+        SELECT 
+            m.path,
+            m.title,
+            COALESCE(m.url, ''),
+            f.snippet,
+            f.rank
+        FROM (
+            SELECT
+                rowid,
+                snippet(docs_fts, 1, ?, ?, '...', 64) as snippet,
+                rank
             FROM docs_fts 
             WHERE docs_fts MATCH ?
-            ORDER BY score
+            ORDER BY rank
             LIMIT ?
-        """
-        
-        cur.execute(sql, (q, top_k))
-        rows = cur.fetchall()
-        
-        results = []
-        for path, title, url, snippet, score in rows:
-            results.append({
-                "path": path,
-                "title": title,
-                "url": url,
-                "snippet": snippet,
-                "score": abs(score),  # bm25 returns negative values
-            })
-        
-        return results
-    finally:
-        conn.close()
+        ) AS f
+        JOIN docs_meta AS m ON m.rowid = f.rowid
+        ORDER BY f.rank
+    """
+    marks = ("<mark>", "</mark>") if highlight else ("", "")
+    
+    params = (*marks, q, top_k)
+    
+    with lock:
+        try:
+            rows = conn.execute(sql, params).fetchall()
+        except sqlite3.OperationalError as e:
+            if "docs_meta" not in str(e):
+                raise
+            rows = None
+    
+    if rows is None:
+        # Index was built before docs_meta existed; rebuild it from docs/
+        build_fts_index(project_id, base_dir)
+        with lock:
+            rows = conn.execute(sql, params).fetchall()
+    
+    results = []
+    for path, title, url, snippet, score in rows:
+        results.append({
+            "path": path,
+            "title": title,
+            "url": url,
+            "snippet": snippet,
+            "score": abs(score),  # bm25 returns negative values
+        })
+    
+    return results
+
+
+def _cache_get(key: tuple) -> Optional[List[Dict[str, Any]]]:
+    """Return an unexpired in-process cache entry, refreshing its LRU position."""
+    with _QUERY_CACHE_LOCK:
+        entry = _QUERY_CACHE.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] > _QUERY_CACHE_TTL:
+            del _QUERY_CACHE[key]
+            return None
+        _QUERY_CACHE.move_to_end(key)
+        return entry[1]
+
+
+def _cache_put(key: tuple, results: List[Dict[str, Any]]) -> None:
+    """Store results in the in-process cache, evicting the oldest entries."""
+    with _QUERY_CACHE_LOCK:
+        _QUERY_CACHE[key] = (time.monotonic(), results)
+        _QUERY_CACHE.move_to_end(key)
+        while len(_QUERY_CACHE) > _QUERY_CACHE_SIZE:
+            _QUERY_CACHE.popitem(last=False)
+
+
+def _shared_cache(base_dir: Optional[str] = None) -> Optional[list]:
+    """Return the [connection, lock, next purge] entry for the sidecar cache.
+
+    The file lives in the data directory (or base_dir for tests). Returns
+    None if it can't be opened; the shared cache is best-effort.
+    """
+    path = (Path(base_dir) if base_dir else settings.data_dir) / _SHARED_CACHE_FILE
+    key = str(path)
+    with _SHARED_CACHE_LOCK:
+        entry = _SHARED_CACHE.get(key)
+        if entry is None:
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(key, timeout=0.25, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=OFF")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS query_cache "
+                    "(key TEXT PRIMARY KEY, ts REAL, result TEXT)"
+                )
+            except (OSError, sqlite3.Error):
+                return None
+            entry = _SHARED_CACHE[key] = [conn, threading.Lock(), 0.0]
+        return entry
+
+
+def _shared_cache_get(shared: Optional[list], key: str) -> Optional[List[Dict[str, Any]]]:
+    """Look up results another process stored in the sidecar cache."""
+    if shared is None:
+        return None
+    conn, lock, _ = shared
+    with lock:
+        try:
+            row = conn.execute(
+                "SELECT result FROM query_cache WHERE key = ? AND ts >= ?",
+                (key, time.time() - _QUERY_CACHE_TTL),
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+    return json.loads(row[0]) if row else None
+
+
+def _shared_cache_put(
+    shared: Optional[list], key: str, results: List[Dict[str, Any]]
+) -> None:
+    """Best-effort write of results to the sidecar cache."""
+    if shared is None:
+        return
+    conn, lock, next_purge = shared
+    now = time.time()
+    with lock:
+        try:
+            with conn:
+                if now >= next_purge:
+                    conn.execute(
+                        "DELETE FROM query_cache WHERE ts < ?", (now - _QUERY_CACHE_TTL,)
+                    )
+                    shared[2] = now + _SHARED_CACHE_PURGE_INTERVAL
+                conn.execute(
+                    "INSERT OR REPLACE INTO query_cache (key, ts, result) VALUES (?, ?, ?)",
+                    (key, now, json.dumps(results)),
+                )
+        except sqlite3.Error:
+            # Locked by another process, read-only disk, ...
+            pass
 
 
 def delete_fts_index(project_id: str, base_dir: Optional[str] = None) -> bool:
     """Delete the FTS index for a project."""
     db_path, _ = _paths_for_project(project_id, base_dir)
+    _close_conn(db_path)
+    with _QUERY_CACHE_LOCK:
+        for key in [k for k in _QUERY_CACHE if k[0] == str(db_path)]:
+            del _QUERY_CACHE[key]
     if db_path.exists():
         db_path.unlink()
         return True
@@ -187,7 +556,7 @@ def get_fts_stats(project_id: str, base_dir: Optional[str] = None) -> Dict[str,
     conn = sqlite3.connect(str(db_path))
     try:
         cur = conn.cursor()
-        cur.execute("SELECT COUNT(*) FROM docs_fts")
+        cur.execute("SELECT COUNT(*) FROM docs_meta")
         count = cur.fetchone()[0]
         
         return {
@@ -3,17 +3,18 @@
 Only loaded when ENABLE_VECTOR_INDEX=1. Requires:
 - sentence-transformers
 - faiss-cpu
+- pyarrow
 
 Install with: pip install -r requirements-vector.txt
 """
 from __future__ import annotations
 
 import os
-import pickle
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 
-from storage import project_dir, docs_dir
+from storage import project_dir, docs_dir, first_heading, markdown_files, parse_frontmatter
 
 
 def _vectors_path(project_id: str) -> Path:
@@ -21,30 +22,188 @@ def _vectors_path(project_id: str) -> Path:
 
 
 def _mappings_path(project_id: str) -> Path:
+    return project_dir(project_id) / "vectors.arrow"
+
+
+def _legacy_mappings_path(project_id: str) -> Path:
+    # Pickled list of dicts written by older versions
     return project_dir(project_id) / "vectors.pkl"
 
 
+def _snippet(content: str) -> str:
+    snippet = content[:200].replace("\n", " ").strip()
+    if len(content) > 200:
+        snippet += "..."
+    return snippet
+
+
+# Concurrent file reads when collecting documents
+_READ_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+
+def _read_text(path: str) -> Optional[str]:
+    try:
+        with open(path, "rb") as f:
+            return f.read().decode("utf-8", "ignore")
+    except Exception:
+        return None
+
+
+# Projects with at least this many documents get an approximate HNSW index
+# instead of an exact linear scan.
+_HNSW_MIN_DOCS = 1000
+_HNSW_M = 32
+_HNSW_EF_CONSTRUCTION = 200
+_HNSW_EF_SEARCH = 64
+
+# Texts per forward pass when embedding documents
+_ENCODE_BATCH_SIZE = 256
+
+# Embedding input is truncated to this many tokens by the tokenizer. Text is
+# also cut to a generous character bound first so long pages aren't fully
+# tokenized only to be thrown away.
+_EMBED_MAX_TOKENS = 256
+_EMBED_MAX_CHARS = _EMBED_MAX_TOKENS * 8
+
+
 # Lazy-load heavy dependencies
 _model = None
 _faiss = None
+_pa = None
+
+
+def _load_arrow():
+    """Lazy-load pyarrow (enough for reading mappings without the model)."""
+    global _pa
+    
+    if _pa is None:
+        try:
+            import pyarrow
+            import pyarrow.ipc  # noqa: F401  (registers pyarrow.ipc)
+        except ImportError as e:
+            raise ImportError(
+                "Vector search requires pyarrow. "
+                "Install with: pip install -r requirements-vector.txt"
+            ) from e
+        _pa = pyarrow
+    
+    return _pa
+
+
+class _OnnxEncoder:
+    """int8-quantized ONNX Runtime stand-in for SentenceTransformer.encode.
+
+    Exports the model once to ~/.cache/docsmcp/onnx/ and applies dynamic
+    int8 quantization. Embeddings are mean-pooled over the attention mask,
+    matching sentence-transformers models trained with mean pooling (such as
+    the default all-MiniLM-L6-v2).
+    """
+    
+    def __init__(self, model_name: str):
+        from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+        from transformers import AutoTokenizer
+        
+        cache_dir = Path.home() / ".cache" / "docsmcp" / "onnx" / model_name.replace("/", "--")
+        quantized_file = cache_dir / "model_quantized.onnx"
+        
+        if not quantized_file.exists():
+            exported = ORTModelForFeatureExtraction.from_pretrained(model_name, export=True)
+            exported.save_pretrained(cache_dir)
+            AutoTokenizer.from_pretrained(model_name).save_pretrained(cache_dir)
+            quantizer = ORTQuantizer.from_pretrained(exported)
+            quantizer.quantize(
+                save_dir=cache_dir,
+                quantization_config=AutoQuantizationConfig.avx512_vnni(is_static=False),
+            )
+        
+        self.tokenizer = AutoTokenizer.from_pretrained(cache_dir)
+        self.max_seq_length = _EMBED_MAX_TOKENS
+        self.model = ORTModelForFeatureExtraction.from_pretrained(
+            cache_dir, file_name=quantized_file.name
+        )
+    
+    def encode(
+        self,
+        texts: List[str],
+        batch_size: int = 32,
+        show_progress_bar: bool = False,
+        convert_to_numpy: bool = True,
+        normalize_embeddings: bool = False,
+    ):
+        import numpy as np
+        
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            encoded = self.tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np",
+            )
+            hidden = self.model(**encoded).last_hidden_state
+            mask = encoded["attention_mask"][..., None].astype(hidden.dtype)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            if normalize_embeddings:
+                norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+                pooled = pooled / np.clip(norms, 1e-12, None)
+            batches.append(pooled.astype(np.float32))
+        
+        return np.concatenate(batches)
+
+
+def _encode(model, texts: List[str]):
+    """Embed texts as L2-normalized float32 vectors (cosine == inner product)."""
+    kwargs = {
+        "batch_size": min(_ENCODE_BATCH_SIZE, max(1, len(texts))),
+        "show_progress_bar": False,
+        "convert_to_numpy": True,
+        "normalize_embeddings": True,
+    }
+    if isinstance(model, _OnnxEncoder):
+        return model.encode(texts, **kwargs)
+    
+    import torch
+    
+    # No autograd bookkeeping for pure inference
+    with torch.inference_mode():
+        return model.encode(texts, **kwargs)
 
 
 def _load_dependencies():
-    """Lazy-load sentence-transformers and faiss."""
+    """Lazy-load the embedding model and faiss.
+
+    EMBEDDING_BACKEND=onnx swaps the PyTorch model for an int8 ONNX Runtime
+    encoder (requires optimum[onnxruntime]).
+    """
     global _model, _faiss
     
     if _model is None:
+        model_name = os.environ.get(
+            "EMBEDDING_MODEL",
+            "sentence-transformers/all-MiniLM-L6-v2"
+        )
+        backend = os.environ.get("EMBEDDING_BACKEND", "torch").lower()
+        
         try:
-            from sentence_transformers import SentenceTransformer
             import faiss
             
-            model_name = os.environ.get(
-                "EMBEDDING_MODEL",
-                "sentence-transformers/all-MiniLM-L6-v2"
-            )
-            _model = SentenceTransformer(model_name)
+            if backend == "onnx":
+                _model = _OnnxEncoder(model_name)
+            else:
+                from sentence_transformers import SentenceTransformer
+                _model = SentenceTransformer(model_name)
+                _model.max_seq_length = min(
+                    _EMBED_MAX_TOKENS, _model.max_seq_length or _EMBED_MAX_TOKENS
+                )
             _faiss = faiss
         except ImportError as e:
+            if backend == "onnx":
+                raise ImportError(
+                    "EMBEDDING_BACKEND=onnx requires optimum[onnxruntime]. "
+                    "Install with: pip install 'optimum[onnxruntime]'"
+                ) from e
             raise ImportError(
                 "Vector search requires sentence-transformers and faiss-cpu. "
                 "Install with: pip install -r requirements-vector.txt"
@@ -59,48 +218,36 @@ def build_vector_index(project_id: str) -> int:
     Returns the number of documents indexed.
     """
     model, faiss = _load_dependencies()
+    pa = _load_arrow()
     
     docs_folder = docs_dir(project_id)
     if not docs_folder.exists():
         return 0
 
-    # Collect documents
+    # Collect documents (reads overlap on a thread pool)
+    files = markdown_files(docs_folder)
+    with ThreadPoolExecutor(max_workers=_READ_WORKERS) as pool:
+        texts = list(pool.map(_read_text, files))
+    
     docs = []
-    for md in sorted(docs_folder.glob("*.md")):
-        try:
-            text = md.read_text(encoding="utf-8", errors="ignore")
-        except Exception:
+    for md, text in zip(files, texts, strict=True):
+        if text is None:
             continue
+        name = os.path.basename(md)
         
         # Parse metadata
-        title = None
-        url = ""
-        
-        if text.startswith("---"):
-            parts = text.split("---", 2)
-            if len(parts) >= 3:
-                import yaml
-                try:
-                    fm = yaml.safe_load(parts[1])
-                    if fm:
-                        title = fm.get("title")
-                        url = fm.get("url", "")
-                    text = parts[2]
-                except Exception:
-                    pass
+        fm, text = parse_frontmatter(text)
+        title = fm.get("title")
+        url = fm.get("url") or ""
         
         if not title:
-            for line in text.splitlines():
-                s = line.strip()
-                if s.startswith("#"):
-                    title = s.lstrip("# ").strip()
-                    break
+            title = first_heading(text)
         
         if not title:
-            title = md.stem
+            title = name[:-3]
         
         docs.append({
-            "path": md.name,
+            "path": name,
             "title": title,
             "url": url,
             "content": text[:8000],  # Limit content length for embedding
@@ -110,15 +257,24 @@ def build_vector_index(project_id: str) -> int:
         return 0
 
     # Generate embeddings
-    texts = [f"{d['title']}\n{d['content'][:2000]}" for d in docs]
-    embeddings = model.encode(texts, show_progress_bar=False, convert_to_numpy=True)
+    texts = [f"{d['title']}\n{d['content'][:_EMBED_MAX_CHARS]}" for d in docs]
+    # Normalized by the encoder, before training the quantizer, so its
+    # per-dimension ranges match the vectors that get stored
+    embeddings = _encode(model, texts)
     
-    # Build FAISS index
+    # Build FAISS index with int8 scalar-quantized vectors. Inner product ==
+    # cosine similarity on normalized vectors; exact scan for small
+    # projects, HNSW graph beyond that.
     dimension = embeddings.shape[1]
-    index = faiss.IndexFlatIP(dimension)  # Inner product (cosine sim with normalized vectors)
+    qtype = faiss.ScalarQuantizer.QT_8bit
+    if len(docs) < _HNSW_MIN_DOCS:
+        index = faiss.IndexScalarQuantizer(dimension, qtype, faiss.METRIC_INNER_PRODUCT)
+    else:
+        index = faiss.IndexHNSWSQ(dimension, qtype, _HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = _HNSW_EF_CONSTRUCTION
+        index.hnsw.efSearch = _HNSW_EF_SEARCH
     
-    # Normalize for cosine similarity
-    faiss.normalize_L2(embeddings)
+    index.train(embeddings)
     index.add(embeddings)
     
     # Save index and mappings
@@ -126,8 +282,19 @@ def build_vector_index(project_id: str) -> int:
     mappings_path = _mappings_path(project_id)
     
     faiss.write_index(index, str(vectors_path))
-    with open(mappings_path, "wb") as f:
-        pickle.dump(docs, f)
+    
+    # Columnar mappings: queries memory-map this file and read only the hit
+    # rows instead of deserializing every document.
+    table = pa.table({
+        "path": [d["path"] for d in docs],
+        "title": [d["title"] for d in docs],
+        "url": [d["url"] for d in docs],
+        "snippet": [_snippet(d["content"]) for d in docs],
+    })
+    with pa.OSFile(str(mappings_path), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    _legacy_mappings_path(project_id).unlink(missing_ok=True)
 
     return len(docs)
 
@@ -142,6 +309,7 @@ def query_vectors(
     Returns list of results with title, path, url, snippet, and score.
     """
     model, faiss = _load_dependencies()
+    pa = _load_arrow()
     
     vectors_path = _vectors_path(project_id)
     mappings_path = _mappings_path(project_id)
@@ -149,37 +317,35 @@ def query_vectors(
     if not vectors_path.exists() or not mappings_path.exists():
         return []
 
-    # Load index and mappings
     index = faiss.read_index(str(vectors_path))
-    with open(mappings_path, "rb") as f:
-        docs = pickle.load(f)
+    if index.ntotal == 0:
+        return []
 
     # Generate query embedding
-    query_embedding = model.encode([query], convert_to_numpy=True)
-    faiss.normalize_L2(query_embedding)
+    query_embedding = _encode(model, [query])
+    
+    # Search (HNSW needs a candidate list at least as long as top_k)
+    if hasattr(index, "hnsw"):
+        index.hnsw.efSearch = max(_HNSW_EF_SEARCH, top_k)
+    scores, indices = index.search(query_embedding, min(top_k, index.ntotal))
+    
+    hits = [(float(score), int(idx)) for score, idx in zip(scores[0], indices[0], strict=True) if idx >= 0]
+    if not hits:
+        return []
     
-    # Search
-    scores, indices = index.search(query_embedding, min(top_k, len(docs)))
+    # Fetch only the hit rows from the memory-mapped mappings
+    with pa.memory_map(str(mappings_path)) as source:
+        table = pa.ipc.open_file(source).read_all()
+        rows = table.take(pa.array([idx for _, idx in hits])).to_pylist()
     
     results = []
-    for score, idx in zip(scores[0], indices[0]):
-        if idx < 0:
-            continue
-        
-        doc = docs[idx]
-        
-        # Generate snippet from content
-        content = doc["content"]
-        snippet = content[:200].replace("\n", " ").strip()
-        if len(content) > 200:
-            snippet += "..."
-        
+    for (score, _), row in zip(hits, rows, strict=True):
         results.append({
-            "path": doc["path"],
-            "title": doc["title"],
-            "url": doc["url"],
-            "snippet": snippet,
-            "score": float(score),
+            "path": row["path"],
+            "title": row["title"],
+            "url": row["url"],
+            "snippet": row["snippet"],
+            "score": score,
         })
     
     return results
@@ -194,9 +360,10 @@ def delete_vector_index(project_id: str) -> bool:
     if vectors_path.exists():
         vectors_path.unlink()
         deleted = True
-    if mappings_path.exists():
-        mappings_path.unlink()
-        deleted = True
+    for path in (mappings_path, _legacy_mappings_path(project_id)):
+        if path.exists():
+            path.unlink()
+            deleted = True
     
     return deleted
 
@@ -216,9 +383,9 @@ def get_vector_stats(project_id: str) -> Dict[str, Any]:
     doc_count = 0
     if mappings_path.exists():
         try:
-            with open(mappings_path, "rb") as f:
-                docs = pickle.load(f)
-                doc_count = len(docs)
+            pa = _load_arrow()
+            with pa.memory_map(str(mappings_path)) as source:
+                doc_count = pa.ipc.open_file(source).read_all().num_rows
         except Exception:
             pass
     
@@ -5,20 +5,25 @@ Provides REST API, MCP endpoint, and Web UI for documentation management.
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import os
 import sys
 import time
-from collections import defaultdict
-from datetime import datetime
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Any, Dict, Optional, List
+from typing import Any, Dict, Optional, List, Tuple
 
+import orjson
 import uvicorn
+from anyio import to_thread
 from fastapi import BackgroundTasks, Depends, FastAPI, HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from pydantic import TypeAdapter, ValidationError
 
 # Add src to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
@@ -30,33 +35,67 @@ from models import (
     DocumentListResponse, Document,
     MCPRequest, MCPResponse,
     HealthResponse, ScrapeStatusResponse,
+    PROJECT_LIST_ADAPTER, SEARCH_RESPONSE_ADAPTER,
 )
 from storage import (
-    list_projects, project_exists, read_json, write_json,
+    list_projects, project_exists, read_json, read_json_cached, write_json,
     config_path, docs_dir, delete_project, get_project_stats,
-    list_documents, read_document,
+    get_project_stats_cached, list_documents, read_document, iso_now,
+    ensure_projects_root,
 )
-from scraper import scrape_project
-from fts_indexer import query_fts, build_fts_index, get_fts_stats
-from mcp_server import handle_mcp_request, MCP_CAPABILITIES
+from scraper import close_client as close_scrape_client, scrape_project
+from fts_indexer import build_fts_index, get_fts_stats
+from mcp_server import dispatch, MCP_CAPABILITIES
+from search import search_projects
 
 
 # --- Application Setup ---
 
+# Worker threads for blocking endpoints and storage/search calls
+THREADPOOL_SIZE = 200
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (bytes out, no str round-trip).
+    
+    Defined here rather than imported from fastapi.responses, where newer
+    releases deprecate it.
+    """
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _model_response(adapter: TypeAdapter, data: Any) -> Response:
+    """Validate data against a response schema and render it in one pass.
+    
+    Used by hot endpoints instead of response_model processing, which
+    validates, dumps to a dict and then encodes that dict separately. The
+    response_model on the route is kept for the OpenAPI schema.
+    """
+    return Response(adapter.dump_json(adapter.validate_python(data)), media_type="application/json")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run background housekeeping for the lifetime of the app."""
+    # Blocking endpoints (plain `def`) and offloaded file/sqlite work share
+    # anyio's thread limiter; the default of 40 is easy to saturate.
+    to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    ensure_projects_root()
+    sweeper = asyncio.create_task(_sweep_rate_limit_buckets())
+    try:
+        yield
+    finally:
+        sweeper.cancel()
+        await close_scrape_client()
+
+
 app = FastAPI(
     title="DocsMCP",
     description="Self-hosted documentation search with MCP support",
     version="1.0.0",
-)
-
-# CORS
-origins = settings.allowed_origins.split(",") if settings.allowed_origins != "*" else ["*"]
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Templates and static files
@@ -68,10 +107,52 @@ templates = Jinja2Templates(directory=str(TEMPLATES_DIR)) if TEMPLATES_DIR.exist
 if STATIC_DIR.exists():
     app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
 
-# Rate limiting
-rate_limit_buckets: Dict[str, Dict[str, Any]] = defaultdict(
-    lambda: {"tokens": settings.rate_limit_requests, "last_refill": time.time()}
+# Rate limiting (GCRA / lazy leaky bucket). Each identifier maps to its
+# theoretical arrival time (TAT) on the time.monotonic() clock; a request is
+# admitted while the TAT stays within the burst window of now.
+class BucketStore:
+    """Bounded LRU map of rate-limit identifier -> TAT.
+    
+    The least recently used identifier is dropped once maxsize is reached,
+    so memory stays bounded no matter how many distinct clients show up.
+    """
+    
+    def __init__(self, maxsize: int = 65536):
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, float] = OrderedDict()
+    
+    def get(self, identifier: str, default: float) -> float:
+        return self._data.get(identifier, default)
+    
+    def __setitem__(self, identifier: str, tat: float) -> None:
+        data = self._data
+        data[identifier] = tat
+        data.move_to_end(identifier)
+        if len(data) > self.maxsize:
+            data.popitem(last=False)
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    def sweep(self, now: float) -> int:
+        """Drop identifiers whose TAT has passed (they'd start a fresh burst anyway)."""
+        expired = [k for k, tat in self._data.items() if tat <= now]
+        for k in expired:
+            del self._data[k]
+        return len(expired)
+    
+    def clear(self) -> None:
+        self._data.clear()
+
+
+rate_limit_buckets = BucketStore(maxsize=65536)
+RATE_LIMIT_SWEEP_INTERVAL = 60
+RATE_LIMIT_INTERVAL = (
+    settings.rate_limit_window / settings.rate_limit_requests
+    if settings.rate_limit_requests > 0 else 0.0
 )
+RATE_LIMIT_BURST = settings.rate_limit_window - RATE_LIMIT_INTERVAL
+RATE_LIMIT_EXEMPT_PATHS = frozenset({"/health", "/healthz", "/readyz", "/metrics"})
 
 # Scrape semaphore
 SCRAPE_SEMAPHORE = asyncio.Semaphore(settings.max_concurrent_scrapes)
@@ -87,6 +168,13 @@ metrics = {
 }
 
 
+async def _sweep_rate_limit_buckets() -> None:
+    """Periodically drop idle rate-limit entries."""
+    while True:
+        await asyncio.sleep(RATE_LIMIT_SWEEP_INTERVAL)
+        rate_limit_buckets.sweep(time.monotonic())
+
+
 # --- Authentication ---
 
 async def verify_token(request: Request) -> None:
@@ -115,8 +203,8 @@ async def rate_limit_middleware(request: Request, call_next):
     """Apply rate limiting to requests."""
     metrics["requests_total"] += 1
     
-    # Skip rate limit for health endpoints
-    if request.url.path in ["/health", "/healthz", "/readyz", "/metrics"]:
+    # Skip rate limit for preflights and health endpoints
+    if request.method == "OPTIONS" or request.url.path in RATE_LIMIT_EXEMPT_PATHS:
         return await call_next(request)
     
     if settings.rate_limit_requests <= 0:
@@ -129,16 +217,12 @@ async def rate_limit_middleware(request: Request, call_next):
         (request.client.host if request.client else "unknown")
     )
     
-    bucket = rate_limit_buckets[identifier]
-    now = time.time()
+    now = time.monotonic()
+    tat = rate_limit_buckets.get(identifier, now)
+    if tat < now:
+        tat = now
     
-    # Refill tokens
-    elapsed = now - bucket["last_refill"]
-    refill = (elapsed / settings.rate_limit_window) * settings.rate_limit_requests
-    bucket["tokens"] = min(settings.rate_limit_requests, bucket["tokens"] + refill)
-    bucket["last_refill"] = now
-    
-    if bucket["tokens"] < 1:
+    if tat - now > RATE_LIMIT_BURST:
         metrics["requests_rate_limited"] += 1
         return JSONResponse(
             status_code=429,
@@ -150,76 +234,135 @@ async def rate_limit_middleware(request: Request, call_next):
             }
         )
     
-    bucket["tokens"] -= 1
+    tat += RATE_LIMIT_INTERVAL
+    rate_limit_buckets[identifier] = tat
     
     response = await call_next(request)
+    remaining = int((settings.rate_limit_window - (tat - now)) / RATE_LIMIT_INTERVAL)
     response.headers["X-RateLimit-Limit"] = str(settings.rate_limit_requests)
-    response.headers["X-RateLimit-Remaining"] = str(int(bucket["tokens"]))
+    response.headers["X-RateLimit-Remaining"] = str(remaining)
     
     return response
 
 
+# CORS is registered last so it is the outermost middleware: preflights are
+# answered before the rate limiter runs.
+if settings.allowed_origins == "*":
+    ALLOWED_ORIGINS = frozenset({"*"})
+else:
+    ALLOWED_ORIGINS = frozenset(
+        o.strip() for o in settings.allowed_origins.split(",") if o.strip()
+    )
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=ALLOWED_ORIGINS,
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+
 # --- Health Endpoints ---
 
+# Probe bodies are prebuilt; a fresh Response is still created per request
+# because middleware (CORS) appends to a response's header list in place.
+_HEALTHZ_BODY = b'{"status":"ok"}'
+_readyz_cache: Tuple[int, bytes] = (-1, b"")
+
+
 @app.get("/health", response_model=HealthResponse)
 async def health():
     """Basic health check."""
-    return {
+    return ORJSONResponse({
         "status": "healthy",
         "version": "1.0.0",
         "uptime_seconds": int(time.time() - metrics["start_time"]),
-    }
+    })
 
 
 @app.get("/healthz")
 async def healthz():
     """Kubernetes liveness probe."""
-    return {"status": "ok"}
+    return Response(_HEALTHZ_BODY, media_type="application/json")
 
 
 @app.get("/readyz")
 async def readyz():
-    """Kubernetes readiness probe."""
-    try:
-        projects_dir = settings.projects_dir
-        if not projects_dir.exists():
-            projects_dir.mkdir(parents=True, exist_ok=True)
-        return {"status": "ready", "projects": len(list_projects())}
-    except Exception as e:
-        return JSONResponse(status_code=503, content={"status": "not_ready", "error": str(e)})
+    """Kubernetes readiness probe.
+    
+    A successful check is reused for the rest of the current second.
+    """
+    global _readyz_cache
+    second = int(time.monotonic())
+    if _readyz_cache[0] != second:
+        try:
+            ensure_projects_root()
+            body = orjson.dumps({"status": "ready", "projects": len(list_projects())})
+        except Exception as e:
+            return ORJSONResponse(status_code=503, content={"status": "not_ready", "error": str(e)})
+        _readyz_cache = (second, body)
+    return Response(_readyz_cache[1], media_type="application/json")
+
+
+_METRICS_TEMPLATE = (
+    b"# HELP docsmcp_scrapes_total Total scrapes\n"
+    b"# TYPE docsmcp_scrapes_total counter\n"
+    b'docsmcp_scrapes_total{status="started"} %d\n'
+    b'docsmcp_scrapes_total{status="completed"} %d\n'
+    b'docsmcp_scrapes_total{status="failed"} %d\n'
+    b"\n"
+    b"# HELP docsmcp_requests_total Total HTTP requests\n"
+    b"# TYPE docsmcp_requests_total counter\n"
+    b'docsmcp_requests_total{status="ok"} %d\n'
+    b'docsmcp_requests_total{status="rate_limited"} %d\n'
+    b"\n"
+    b"# HELP docsmcp_projects_total Total projects\n"
+    b"# TYPE docsmcp_projects_total gauge\n"
+    b"docsmcp_projects_total %d\n"
+)
 
 
 @app.get("/metrics", response_class=PlainTextResponse)
 async def get_metrics():
     """Prometheus-compatible metrics."""
-    lines = [
-        "# HELP docsmcp_scrapes_total Total scrapes",
-        "# TYPE docsmcp_scrapes_total counter",
-        f'docsmcp_scrapes_total{{status="started"}} {metrics["scrapes_started"]}',
-        f'docsmcp_scrapes_total{{status="completed"}} {metrics["scrapes_completed"]}',
-        f'docsmcp_scrapes_total{{status="failed"}} {metrics["scrapes_failed"]}',
-        "",
-        "# HELP docsmcp_requests_total Total HTTP requests",
-        "# TYPE docsmcp_requests_total counter",
-        f'docsmcp_requests_total{{status="ok"}} {metrics["requests_total"] - metrics["requests_rate_limited"]}',
-        f'docsmcp_requests_total{{status="rate_limited"}} {metrics["requests_rate_limited"]}',
-        "",
-        "# HELP docsmcp_projects_total Total projects",
-        "# TYPE docsmcp_projects_total gauge",
-        f"docsmcp_projects_total {len(list_projects())}",
-    ]
-    return "\n".join(lines)
+    body = _METRICS_TEMPLATE % (
+        metrics["scrapes_started"],
+        metrics["scrapes_completed"],
+        metrics["scrapes_failed"],
+        metrics["requests_total"] - metrics["requests_rate_limited"],
+        metrics["requests_rate_limited"],
+        len(list_projects()),  # cached until the projects directory changes
+    )
+    return PlainTextResponse(body)
 
 
 # --- Project Endpoints ---
 
-@app.get(\"/api/stats\")\nasync def get_stats():\n    \"\"\"Get overall system statistics.\"\"\"\n    projects = list_projects()\n    total_projects = len(projects)\n    total_documents = 0\n    \n    for project_id in projects:\n        stats = get_project_stats(project_id)\n        total_documents += stats[\"page_count\"]\n    \n    return {\n        \"projects\": total_projects,\n        \"documents\": total_documents,\n        \"index_type\": \"Vector + FTS\" if settings.enable_vector_index else \"FTS Only\",\n    }\n\n\n@app.get(\"/api/projects\", response_model=List[Project], dependencies=[Depends(verify_token)])
-async def get_projects():
+@app.get("/api/stats")
+def get_stats():
+    """Get overall system statistics."""
+    projects = list_projects()
+    total_projects = len(projects)
+    total_documents = 0
+    
+    for project_id in projects:
+        stats = get_project_stats_cached(project_id)
+        total_documents += stats["page_count"]
+    
+    return {
+        "projects": total_projects,
+        "documents": total_documents,
+        "index_type": "Vector + FTS" if settings.enable_vector_index else "FTS Only",
+    }
+
+
+@app.get("/api/projects", response_model=List[Project], dependencies=[Depends(verify_token)])
+def get_projects():
     """List all projects."""
     projects = []
     for project_id in list_projects():
-        config = read_json(config_path(project_id))
-        stats = get_project_stats(project_id)
+        config = read_json_cached(config_path(project_id))
+        stats = get_project_stats_cached(project_id)
         projects.append({
             "id": project_id,
             "base_url": config.get("baseUrl", ""),
@@ -229,11 +372,11 @@ async def get_projects():
             "last_scraped": config.get("completedAt"),
             "created_at": config.get("createdAt"),
         })
-    return projects
+    return _model_response(PROJECT_LIST_ADAPTER, projects)
 
 
 @app.get("/api/projects/{project_id}", dependencies=[Depends(verify_token)])
-async def get_project(project_id: str):
+def get_project(project_id: str):
     """Get project details."""
     if not project_exists(project_id):
         raise HTTPException(status_code=404, detail=f"Project '{project_id}' not found")
@@ -255,7 +398,7 @@ async def get_project(project_id: str):
 
 
 @app.post("/api/projects", response_model=ProjectResponse, dependencies=[Depends(verify_token)])
-async def create_project(data: ProjectCreate):
+def create_project(data: ProjectCreate):
     """Create a new project."""
     if project_exists(data.id):
         # If project already exists, return its basic info instead of raising.
@@ -273,7 +416,7 @@ async def create_project(data: ProjectCreate):
         "baseUrl": data.base_url,
         "config": data.config.model_dump() if data.config else {},
         "status": "created",
-        "createdAt": datetime.utcnow().isoformat(),
+        "createdAt": iso_now(),
     }
     write_json(config_path(data.id), config)
     
@@ -287,22 +430,23 @@ async def create_project(data: ProjectCreate):
 
 
 @app.patch("/api/projects/{project_id}", dependencies=[Depends(verify_token)])
-async def update_project(project_id: str, data: ProjectUpdate):
+def update_project(project_id: str, data: ProjectUpdate):
     """Update project configuration."""
     if not project_exists(project_id):
         raise HTTPException(status_code=404, detail=f"Project '{project_id}' not found")
     
     config = read_json(config_path(project_id))
     if data.config:
-        config["config"] = {**config.get("config", {}), **data.config.model_dump(exclude_unset=True)}
-    config["updatedAt"] = datetime.utcnow().isoformat()
+        changes = data.config.model_dump(exclude_unset=True)
+        config["config"] = {**config.get("config", {}), **changes}
+    config["updatedAt"] = iso_now()
     write_json(config_path(project_id), config)
     
     return {"id": project_id, "status": "updated", "config": config.get("config")}
 
 
 @app.delete("/api/projects/{project_id}", dependencies=[Depends(verify_token)])
-async def remove_project(project_id: str):
+def remove_project(project_id: str):
     """Delete a project and all its data."""
     if not project_exists(project_id):
         raise HTTPException(status_code=404, detail=f"Project '{project_id}' not found")
@@ -314,7 +458,7 @@ async def remove_project(project_id: str):
 # --- Scrape Endpoints ---
 
 @app.post("/api/projects/{project_id}/scrape", dependencies=[Depends(verify_token)])
-async def start_scrape(project_id: str, background_tasks: BackgroundTasks, full_rescrape: bool = False):
+def start_scrape(project_id: str, background_tasks: BackgroundTasks, full_rescrape: bool = False):
     """Start scraping a project."""
     if not project_exists(project_id):
         raise HTTPException(status_code=404, detail=f"Project '{project_id}' not found")
@@ -323,20 +467,24 @@ async def start_scrape(project_id: str, background_tasks: BackgroundTasks, full_
     if config.get("status") == "scraping":
         raise HTTPException(status_code=409, detail="Scrape already in progress")
     
+    # Resolve the crawl options now; the task only needs the finished kwargs
+    cfg = config.get("config") or {}
+    include_patterns = cfg.get("include_patterns")
+    exclude_patterns = cfg.get("exclude_patterns")
+    base_url = config.get("baseUrl")
+    scrape_kwargs = {
+        "max_depth": cfg.get("max_depth", settings.max_depth),
+        "max_pages": cfg.get("max_pages", settings.max_pages_per_project),
+        "include": include_patterns[0] if include_patterns else None,
+        "exclude": exclude_patterns[0] if exclude_patterns else None,
+        "clear_existing": full_rescrape,
+    }
+    
     async def do_scrape():
         async with SCRAPE_SEMAPHORE:
             metrics["scrapes_started"] += 1
             try:
-                cfg = config.get("config", {})
-                await scrape_project(
-                    project_id,
-                    config["baseUrl"],
-                    max_depth=cfg.get("max_depth", settings.max_depth),
-                    max_pages=cfg.get("max_pages", settings.max_pages_per_project),
-                    include=cfg.get("include_patterns", [None])[0] if cfg.get("include_patterns") else None,
-                    exclude=cfg.get("exclude_patterns", [None])[0] if cfg.get("exclude_patterns") else None,
-                    clear_existing=full_rescrape,
-                )
+                await scrape_project(project_id, base_url, **scrape_kwargs)
                 metrics["scrapes_completed"] += 1
             except Exception:
                 metrics["scrapes_failed"] += 1
@@ -351,7 +499,7 @@ async def start_scrape(project_id: str, background_tasks: BackgroundTasks, full_
 
 
 @app.get("/api/projects/{project_id}/status", dependencies=[Depends(verify_token)])
-async def get_scrape_status(project_id: str):
+def get_scrape_status(project_id: str):
     """Get scrape status for a project."""
     if not project_exists(project_id):
         raise HTTPException(status_code=404, detail=f"Project '{project_id}' not found")
@@ -366,7 +514,7 @@ async def get_scrape_status(project_id: str):
 
 
 @app.post("/api/projects/{project_id}/cancel", dependencies=[Depends(verify_token)])
-async def cancel_scrape(project_id: str):
+def cancel_scrape(project_id: str):
     """Cancel an in-progress scrape."""
     if not project_exists(project_id):
         raise HTTPException(status_code=404, detail=f"Project '{project_id}' not found")
@@ -376,7 +524,7 @@ async def cancel_scrape(project_id: str):
         raise HTTPException(status_code=409, detail="No scrape in progress")
     
     config["status"] = "cancelled"
-    config["updatedAt"] = datetime.utcnow().isoformat()
+    config["updatedAt"] = iso_now()
     write_json(config_path(project_id), config)
     
     return {"id": project_id, "status": "cancelled"}
@@ -387,7 +535,7 @@ async def cancel_scrape(project_id: str):
 @app.post("/api/search", response_model=SearchResponse, dependencies=[Depends(verify_token)])
 async def search_all(data: SearchRequest):
     """Search across all projects."""
-    return await _do_search(data.query, data.limit, None)
+    return _model_response(SEARCH_RESPONSE_ADAPTER, await _do_search(data.query, data.limit, None))
 
 
 @app.post("/api/projects/{project_id}/search", response_model=SearchResponse, dependencies=[Depends(verify_token)])
@@ -395,50 +543,20 @@ async def search_project(project_id: str, data: SearchRequest):
     """Search within a specific project."""
     if not project_exists(project_id):
         raise HTTPException(status_code=404, detail=f"Project '{project_id}' not found")
-    return await _do_search(data.query, data.limit, project_id)
+    return _model_response(SEARCH_RESPONSE_ADAPTER, await _do_search(data.query, data.limit, project_id))
 
 
 async def _do_search(query: str, limit: int, project_id: Optional[str]) -> Dict[str, Any]:
     """Internal search implementation."""
+    # File and sqlite reads block, so keep them off the event loop
+    return await to_thread.run_sync(_search_sync, query, limit, project_id)
+
+
+def _search_sync(query: str, limit: int, project_id: Optional[str]) -> Dict[str, Any]:
     start_time = time.time()
     
     project_ids = [project_id] if project_id else list_projects()
-    all_results = []
-    
-    for pid in project_ids:
-        try:
-            # Try vector search if enabled
-            if settings.enable_vector_index:
-                try:
-                    from indexer import query_vectors
-                    results = query_vectors(pid, query, limit)
-                    if results:
-                        for r in results:
-                            config = read_json(config_path(pid))
-                            r["project"] = pid
-                            if not r.get("url"):
-                                doc = read_document(pid, r["path"])
-                                if doc:
-                                    r["url"] = doc.get("url", "")
-                        all_results.extend(results)
-                        continue
-                except ImportError:
-                    pass
-            
-            # FTS fallback
-            results = query_fts(pid, query, limit)
-            for r in results:
-                r["project"] = pid
-                if not r.get("url"):
-                    doc = read_document(pid, r["path"])
-                    if doc:
-                        r["url"] = doc.get("url", "")
-            all_results.extend(results)
-        except Exception:
-            continue
-    
-    all_results.sort(key=lambda x: x.get("score", 0), reverse=True)
-    all_results = all_results[:limit]
+    all_results = search_projects(project_ids, query, limit, highlight=True)
     
     return {
         "results": all_results,
@@ -450,7 +568,7 @@ async def _do_search(query: str, limit: int, project_id: Optional[str]) -> Dict[
 # --- Document Endpoints ---
 
 @app.get("/api/projects/{project_id}/documents", dependencies=[Depends(verify_token)])
-async def get_documents(project_id: str, page: int = 1, limit: int = 50):
+def get_documents(project_id: str, page: int = 1, limit: int = 50):
     """List documents in a project."""
     if not project_exists(project_id):
         raise HTTPException(status_code=404, detail=f"Project '{project_id}' not found")
@@ -458,7 +576,7 @@ async def get_documents(project_id: str, page: int = 1, limit: int = 50):
 
 
 @app.get("/api/projects/{project_id}/documents/{doc_path:path}", dependencies=[Depends(verify_token)])
-async def get_document(project_id: str, doc_path: str):
+def get_document(project_id: str, doc_path: str):
     """Get a specific document."""
     if not project_exists(project_id):
         raise HTTPException(status_code=404, detail=f"Project '{project_id}' not found")
@@ -467,16 +585,31 @@ async def get_document(project_id: str, doc_path: str):
     if not doc:
         raise HTTPException(status_code=404, detail=f"Document '{doc_path}' not found")
     
-    return doc
+    # Render straight to bytes; returning the dict would first walk (and copy)
+    # the whole document through jsonable_encoder.
+    return ORJSONResponse(doc)
 
 
 # --- MCP Endpoint ---
 
-@app.post("/mcp", dependencies=[Depends(verify_token)])
-async def mcp_endpoint(request: MCPRequest):
+@app.post(
+    "/mcp",
+    dependencies=[Depends(verify_token)],
+    openapi_extra={"requestBody": {
+        "content": {"application/json": {"schema": MCPRequest.model_json_schema()}},
+        "required": True,
+    }},
+)
+async def mcp_endpoint(request: Request):
     """MCP JSON-RPC endpoint."""
-    response = await handle_mcp_request(request)
-    return response.model_dump(exclude_none=True)
+    # Validate the raw body in pydantic-core rather than json.loads + validate
+    try:
+        rpc = MCPRequest.model_validate_json(await request.body())
+    except ValidationError as e:
+        errors = [{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)]
+        raise RequestValidationError(errors) from e
+    # Handlers return plain JSON-ready dicts, so skip jsonable_encoder
+    return ORJSONResponse(await dispatch(rpc.method, rpc.params, rpc.id))
 
 
 @app.get("/mcp/capabilities")
@@ -487,9 +620,14 @@ async def mcp_capabilities():
 
 # --- Web UI ---
 
+_web_ui_cache: Tuple[str, bytes] = ("", b"")
+
+
 @app.get("/", response_class=HTMLResponse)
-async def web_ui(request: Request):
+def web_ui(request: Request):
     """Serve the web dashboard."""
+    global _web_ui_cache
+    
     if not templates:
         return HTMLResponse(
             "<html><body><h1>DocsMCP</h1><p>Web UI not available. "
@@ -498,23 +636,38 @@ async def web_ui(request: Request):
     
     projects = []
     for project_id in list_projects():
-        config = read_json(config_path(project_id))
-        stats = get_project_stats(project_id)
+        config = read_json_cached(config_path(project_id))
+        stats = get_project_stats_cached(project_id)
         projects.append({
             "id": project_id,
             "base_url": config.get("baseUrl", ""),
             "page_count": stats["page_count"],
             "status": config.get("status", "unknown"),
         })
+    ui_settings = {
+        "enable_auth": settings.enable_auth,
+        "enable_vector": settings.enable_vector_index,
+    }
     
-    return templates.TemplateResponse("index.html", {
-        "request": request,
-        "projects": projects,
-        "settings": {
-            "enable_auth": settings.enable_auth,
-            "enable_vector": settings.enable_vector_index,
-        },
-    })
+    # The page is a pure function of these inputs, so hash them for the ETag
+    # and only re-render when they change.
+    digest = hashlib.blake2b(
+        orjson.dumps([str(request.base_url), ui_settings, projects]), digest_size=16
+    ).hexdigest()
+    etag = f'"{digest}"'
+    headers = {"ETag": etag, "Cache-Control": "max-age=5"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    
+    cached_etag, body = _web_ui_cache
+    if cached_etag != etag:
+        body = templates.get_template("index.html").render({
+            "request": request,
+            "projects": projects,
+            "settings": ui_settings,
+        }).encode()
+        _web_ui_cache = (etag, body)
+    return HTMLResponse(body, headers=headers)
 
 
 # --- Main ---
@@ -526,6 +679,7 @@ def main():
     parser = argparse.ArgumentParser(description="DocsMCP Server")
     parser.add_argument("--host", default=settings.host, help="Host to bind")
     parser.add_argument("--port", type=int, default=settings.port, help="Port to bind")
+    parser.add_argument("--workers", type=int, default=settings.workers, help="Worker processes")
     parser.add_argument("--reload", action="store_true", help="Enable auto-reload")
     parser.add_argument("--validate-config", action="store_true", help="Validate configuration and exit")
     
@@ -545,15 +699,33 @@ def main():
     print(f"Data directory: {settings.data_dir}")
     print(f"Auth enabled: {settings.enable_auth}")
     print(f"Vector search: {settings.enable_vector_index}")
+    if args.workers > 1:
+        print(f"Workers: {args.workers}")
     
     uvicorn.run(
         "main:app",
         host=args.host,
         port=args.port,
         reload=args.reload,
+        # Rate limits, metrics and the scrape semaphore are per worker
+        workers=None if args.reload else args.workers,
         log_level=settings.log_level.lower(),
+        loop=_server_loop(),
+        http=_server_http(),
     )
 
 
+def _server_loop() -> str:
+    """uvloop when installed (not available on Windows), else stock asyncio."""
+    import importlib.util
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def _server_http() -> str:
+    """httptools' C parser when installed, else h11."""
+    import importlib.util
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
 if __name__ == "__main__":
     main()
@@ -1,16 +1,17 @@
 """MCP JSON-RPC server implementation."""
 from __future__ import annotations
 
+import inspect
 import time
 from typing import Any, Dict, List, Optional
 
-from models import MCPRequest, MCPResponse, MCPError
+from anyio import to_thread
+
 from storage import (
-    list_projects, project_exists, read_json, config_path,
-    get_project_stats, read_document, docs_dir
+    list_projects, project_exists, read_json_cached, config_path,
+    get_project_stats_cached, read_document, docs_dir
 )
-from fts_indexer import query_fts
-from config import settings
+from search import search_projects
 
 
 # MCP method handlers
@@ -18,53 +19,64 @@ _handlers: Dict[str, callable] = {}
 
 
 def mcp_method(name: str):
-    """Decorator to register MCP method handlers."""
+    """Decorator to register MCP method handlers.
+    
+    Handlers may be plain functions (run in a worker thread) or coroutines.
+    """
     def decorator(func):
         _handlers[name] = func
         return func
     return decorator
 
 
-async def handle_mcp_request(request: MCPRequest) -> MCPResponse:
-    """Process an MCP JSON-RPC request."""
-    
-    if request.method not in _handlers:
-        return MCPResponse(
-            id=request.id,
-            error=MCPError(
-                code=-32601,
-                message=f"Method not found: {request.method}"
-            )
-        )
+# JSON-RPC error code per exception type (matched along the MRO)
+_ERROR_CODES: Dict[type, int] = {
+    ValueError: -32602,         # invalid params
+    FileNotFoundError: -32000,  # unknown project/document
+}
+
+
+def _error_code(exc: Exception) -> int:
+    for cls in type(exc).__mro__:
+        code = _ERROR_CODES.get(cls)
+        if code is not None:
+            return code
+    return -32603
+
+
+def _error_response(request_id: Any, code: int, message: str) -> Dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+async def dispatch(method: str, params: Any, request_id: Any) -> Dict[str, Any]:
+    """Run an MCP method and return the JSON-RPC response as a plain dict."""
+    handler = _handlers.get(method)
+    if handler is None:
+        return _error_response(request_id, -32601, f"Method not found: {method}")
+    if not params:
+        params = {}
+    elif not isinstance(params, dict):
+        return _error_response(request_id, -32602, "params must be an object")
     
     try:
-        result = await _handlers[request.method](request.params)
-        return MCPResponse(id=request.id, result=result)
-    except ValueError as e:
-        return MCPResponse(
-            id=request.id,
-            error=MCPError(code=-32602, message=str(e))
-        )
-    except FileNotFoundError as e:
-        return MCPResponse(
-            id=request.id,
-            error=MCPError(code=-32000, message=str(e))
-        )
+        if inspect.iscoroutinefunction(handler):
+            result = await handler(params)
+        else:
+            # Handlers do blocking file/sqlite I/O; run them off the loop
+            result = await to_thread.run_sync(handler, params)
     except Exception as e:
-        return MCPResponse(
-            id=request.id,
-            error=MCPError(code=-32603, message=str(e))
-        )
+        return _error_response(request_id, _error_code(e), str(e))
+    return {"jsonrpc": "2.0", "id": request_id, "result": result}
 
 
 @mcp_method("list_projects")
-async def list_projects_handler(params: Dict[str, Any]) -> Dict[str, Any]:
+def list_projects_handler(params: Dict[str, Any]) -> Dict[str, Any]:
     """List all indexed documentation projects."""
     
     projects = []
     for project_id in list_projects():
-        config = read_json(config_path(project_id))
-        stats = get_project_stats(project_id)
+        config = read_json_cached(config_path(project_id))
+        stats = get_project_stats_cached(project_id)
         
         projects.append({
             "id": project_id,
@@ -78,7 +90,7 @@ async def list_projects_handler(params: Dict[str, Any]) -> Dict[str, Any]:
 
 
 @mcp_method("search_docs")
-async def search_docs_handler(params: Dict[str, Any]) -> Dict[str, Any]:
+def search_docs_handler(params: Dict[str, Any]) -> Dict[str, Any]:
     """Search documentation across all or specific projects."""
     
     query = params.get("query")
@@ -98,46 +110,7 @@ async def search_docs_handler(params: Dict[str, Any]) -> Dict[str, Any]:
     else:
         project_ids = list_projects()
     
-    # Search each project
-    all_results = []
-    
-    for pid in project_ids:
-        try:
-            # Try vector search first if enabled
-            if settings.enable_vector_index:
-                try:
-                    from indexer import query_vectors
-                    results = query_vectors(pid, query, limit)
-                    if results:
-                        for r in results:
-                            r["project"] = pid
-                            # Get URL from document if not in result
-                            if not r.get("url"):
-                                doc = read_document(pid, r["path"])
-                                if doc:
-                                    r["url"] = doc.get("url", "")
-                        all_results.extend(results)
-                        continue
-                except ImportError:
-                    pass
-            
-            # Fallback to FTS
-            results = query_fts(pid, query, limit)
-            for r in results:
-                r["project"] = pid
-                # Get URL from document if not in result
-                if not r.get("url"):
-                    doc = read_document(pid, r["path"])
-                    if doc:
-                        r["url"] = doc.get("url", "")
-            all_results.extend(results)
-            
-        except Exception:
-            continue
-    
-    # Sort by score and limit
-    all_results.sort(key=lambda x: x.get("score", 0), reverse=True)
-    all_results = all_results[:limit]
+    all_results = search_projects(project_ids, query, limit)
     
     query_time_ms = int((time.time() - start_time) * 1000)
     
@@ -149,7 +122,7 @@ async def search_docs_handler(params: Dict[str, Any]) -> Dict[str, Any]:
 
 
 @mcp_method("get_document")
-async def get_document_handler(params: Dict[str, Any]) -> Dict[str, Any]:
+def get_document_handler(params: Dict[str, Any]) -> Dict[str, Any]:
     """Retrieve full content of a specific document."""
     
     project_id = params.get("project")
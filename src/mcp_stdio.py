@@ -6,77 +6,124 @@ to spawn DocsMCP as a subprocess and communicate via stdin/stdout.
 from __future__ import annotations
 
 import asyncio
-import json
 import sys
 from pathlib import Path
 
+import orjson
+
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from mcp_server import handle_mcp_request, MCP_CAPABILITIES
-from models import MCPRequest
+from mcp_server import dispatch, MCP_CAPABILITIES
+
+READ_CHUNK_SIZE = 64 * 1024
+
+
+def _error(request_id, code: int, message: str) -> bytes:
+    return orjson.dumps({
+        "jsonrpc": "2.0",
+        "error": {"code": code, "message": message},
+        "id": request_id,
+    })
 
 
-async def handle_line(line: str) -> str:
-    """Process a single JSON-RPC request line."""
+async def handle_line(line: bytes | bytearray | str) -> bytes:
+    """Process a single JSON-RPC request line.
+    
+    Requests are decoded straight to dicts and responses built by hand;
+    Pydantic validation is only used on the HTTP transport.
+    """
     try:
-        data = json.loads(line)
-        request = MCPRequest(**data)
-        response = await handle_mcp_request(request)
-        return json.dumps(response.model_dump(exclude_none=True))
-    except json.JSONDecodeError as e:
-        return json.dumps({
-            "jsonrpc": "2.0",
-            "error": {"code": -32700, "message": f"Parse error: {e}"},
-            "id": None,
-        })
+        data = orjson.loads(line)
+    except orjson.JSONDecodeError as e:
+        return _error(None, -32700, f"Parse error: {e}")
+    
+    if not isinstance(data, dict) or not isinstance(data.get("method"), str):
+        request_id = data.get("id") if isinstance(data, dict) else None
+        return _error(request_id, -32600, "Invalid Request")
+    
+    try:
+        response = await dispatch(data["method"], data.get("params"), data.get("id"))
+        return orjson.dumps(response)
     except Exception as e:
-        return json.dumps({
-            "jsonrpc": "2.0",
-            "error": {"code": -32603, "message": str(e)},
-            "id": None,
-        })
+        return _error(data.get("id"), -32603, str(e))
+
+
+def _write(payload: bytes) -> None:
+    out = sys.stdout.buffer
+    out.write(payload + b"\n")
+    out.flush()
+
+
+async def _respond(frame: bytes | bytearray) -> None:
+    try:
+        _write(await handle_line(frame))
+    except Exception as e:
+        _write(_error(None, -32603, str(e)))
 
 
 async def main():
-    """Main STDIO loop."""
+    """Main STDIO loop.
+    
+    stdin is read in large chunks and split into newline-delimited frames
+    locally; each frame is handled in its own task so requests overlap
+    (JSON-RPC clients match responses by id, not by order).
+    """
     # Send capabilities on startup
-    print(json.dumps({
+    _write(orjson.dumps({
         "jsonrpc": "2.0",
         "result": {"capabilities": MCP_CAPABILITIES},
         "id": 0,
-    }), flush=True)
+    }))
     
     # Read from stdin, write to stdout
     reader = asyncio.StreamReader()
     protocol = asyncio.StreamReaderProtocol(reader)
-    await asyncio.get_event_loop().connect_read_pipe(lambda: protocol, sys.stdin)
+    await asyncio.get_running_loop().connect_read_pipe(lambda: protocol, sys.stdin)
+    
+    buffer = bytearray()
+    pending: set[asyncio.Task] = set()
+    
+    def dispatch_frames(frames) -> None:
+        for frame in frames:
+            frame = frame.strip()
+            if frame:
+                task = asyncio.create_task(_respond(frame))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
     
-    while True:
-        try:
-            line = await reader.readline()
-            if not line:
+    try:
+        while True:
+            chunk = await reader.read(READ_CHUNK_SIZE)
+            if not chunk:
                 break
-            
-            line = line.decode().strip()
-            if not line:
+            buffer += chunk
+            end = buffer.rfind(b"\n")
+            if end < 0:
                 continue
-            
-            response = await handle_line(line)
-            print(response, flush=True)
-            
-        except asyncio.CancelledError:
-            break
-        except Exception as e:
-            print(json.dumps({
-                "jsonrpc": "2.0",
-                "error": {"code": -32603, "message": str(e)},
-                "id": None,
-            }), flush=True)
+            dispatch_frames(buffer[:end].split(b"\n"))
+            del buffer[:end + 1]
+        
+        # A final request may arrive without a trailing newline
+        dispatch_frames([buffer])
+        if pending:
+            await asyncio.gather(*pending)
+    except asyncio.CancelledError:
+        pass
+
+
+def _loop_factory():
+    """uvloop's event loop when installed (not available on Windows)."""
+    try:
+        import uvloop
+    except ImportError:
+        return None
+    return uvloop.new_event_loop
 
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        with asyncio.Runner(loop_factory=_loop_factory()) as runner:
+            runner.run(main())
     except KeyboardInterrupt:
         pass
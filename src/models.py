@@ -1,9 +1,10 @@
 """Pydantic models for API request/response schemas."""
 from __future__ import annotations
 
+from dataclasses import dataclass
 from datetime import datetime
 from typing import Any, Dict, List, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 
 
 # --- Project Models ---
@@ -102,8 +103,13 @@ class SearchRequest(BaseModel):
     limit: int = Field(default=10, ge=1, le=100)
 
 
-class SearchResult(BaseModel):
-    """Single search result."""
+@dataclass(frozen=True, slots=True)
+class SearchResult:
+    """Single search result.
+    
+    A plain slotted dataclass rather than a BaseModel: results are internal,
+    trusted data, and pydantic still validates/serializes it as a field.
+    """
     project: str
     title: str
     url: str
@@ -120,8 +126,9 @@ class SearchResponse(BaseModel):
 
 # --- Document Models ---
 
-class DocumentMeta(BaseModel):
-    """Document metadata."""
+@dataclass(frozen=True, slots=True)
+class DocumentMeta:
+    """Document metadata (a slotted dataclass, like SearchResult)."""
     path: str
     title: str
     url: str
@@ -153,7 +160,8 @@ class MCPRequest(BaseModel):
     """JSON-RPC 2.0 request."""
     jsonrpc: str = "2.0"
     method: str
-    params: Dict[str, Any] = Field(default_factory=dict)
+    # Left as Any so pydantic does not walk the dict; dispatch checks the shape
+    params: Any = None
     id: int | str | None = None
 
 
@@ -201,3 +209,11 @@ class WebhookPayload(BaseModel):
     duration_seconds: int = 0
     error_message: Optional[str] = None
     timestamp: datetime = Field(default_factory=datetime.utcnow)
+
+
+# --- Serializers ---
+# Built once at import; validate_python()/dump_json() on these go straight to
+# JSON bytes in pydantic-core.
+
+PROJECT_LIST_ADAPTER = TypeAdapter(List[Project])
+SEARCH_RESPONSE_ADAPTER = TypeAdapter(SearchResponse)
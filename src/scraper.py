@@ -6,31 +6,90 @@ from __future__ import annotations
 
 import asyncio
 import hashlib
+import importlib.util
+import json
 import re
+import time
 from collections import deque
-from datetime import datetime
-from typing import Any, Callable, Dict, List, Optional, Set, Tuple
-from urllib.parse import urljoin, urlparse
+from dataclasses import dataclass
+from typing import Any, Callable, Container, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import quote, unquote, urljoin, urlparse, urlunparse
 from urllib.robotparser import RobotFileParser
 
 import httpx
 import trafilatura
-from bs4 import BeautifulSoup
-from markdownify import markdownify as md
+import lxml.etree
+import lxml.html
 
 from config import settings
-from storage import config_path, docs_dir, index_path, read_json, write_json
+from storage import config_path, docs_dir, index_path, iso_now, read_json, write_json
 from fts_indexer import build_fts_index
 
 
+# Links to binaries and images are never crawled (query strings included)
+_SKIP_EXT_RE = re.compile(r"\.(?:pdf|zip|tar|gz|exe|dmg|png|jpe?g|gif|svg)(?:[?#]|$)", re.I)
+
+# Root-relative link in its common shape: a "/path" (not "//host") with no
+# params or whitespace, then an optional query and fragment. Dot segments are
+# checked separately; anything else goes through urljoin/urlparse.
+_SIMPLE_LINK_RE = re.compile(r"(/(?!/)[^\s;?#]*)(?:\?([^\s#]*))?(?:#.*)?\Z", re.S)
+
+# Characters YAML doesn't allow (or treats as line breaks) inside a quoted
+# scalar; json.dumps already escapes the C0 controls
+_YAML_UNSAFE_RE = re.compile("[\x7f-\x9f\u2028\u2029\ud800-\udfff\ufeff\ufffe\uffff]")
+
+# Slug cleanup: anything but word characters and "-" becomes "-", runs of
+# "-" collapse. ASCII paths (the common case) use a byte translate table.
+_NONSLUG_RE = re.compile(r"[^\w\-]")
+_DASH_RE = re.compile(r"-+")
+_SLUG_TABLE = bytes(
+    c if chr(c).isascii() and (chr(c).isalnum() or chr(c) in "_-") else ord("-")
+    for c in range(256)
+)
+
+# Shared HTTP client (one connection pool for robots.txt and page fetches).
+# httpx clients are tied to the event loop they first ran on, so a new one is
+# made if scrapes later run on a different loop (e.g. successive asyncio.run).
+_CLIENT: Optional[httpx.AsyncClient] = None
+_CLIENT_LOOP: Optional[asyncio.AbstractEventLoop] = None
+
+# robots.txt rules that apply to our user agent, as (path prefix, allowed)
+# pairs ordered most specific first
+RobotsRules = Tuple[Tuple[str, bool], ...]
+
+# (scheme, host) -> (expiry on time.monotonic(), rules or None)
+ROBOTS_CACHE_TTL = 3600.0
+_ROBOTS_CACHE: Dict[Tuple[str, str], Tuple[float, Optional[RobotsRules]]] = {}
+
+# HTML -> Markdown fallback: chrome that is skipped outright, and tags that
+# start a new paragraph
+_CHROME_TAGS = frozenset({"nav", "header", "footer", "aside", "script", "style"})
+_BLOCK_TAGS = frozenset({
+    "address", "article", "blockquote", "dd", "details", "div", "dl", "dt",
+    "figcaption", "figure", "form", "hr", "main", "ol", "p", "section",
+    "summary", "ul",
+})
+_TABLE_ROWS_XPATH = "./tr | ./thead/tr | ./tbody/tr | ./tfoot/tr"
+_HEADING_LEVELS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+_WS_RE = re.compile(r"\s+")
+_LINE_WS_RE = re.compile(r" *\n *")
+
+# Progress is persisted to config.json at most every N pages or T seconds
+PROGRESS_FLUSH_PAGES = 10
+PROGRESS_FLUSH_INTERVAL = 1.0
+
+
+@dataclass(slots=True)
 class ScrapeStats:
     """Scrape progress statistics."""
     
-    def __init__(self):
-        self.pages_fetched = 0
-        self.pages_written = 0
-        self.errors = 0
-        self.progress = "Starting..."
+    pages_fetched: int = 0
+    pages_written: int = 0
+    errors: int = 0
+    progress: str = "Starting..."
+    # When and at what page count progress was last written to disk
+    last_flush_ts: float = 0.0
+    last_flush_count: int = 0
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -41,6 +100,30 @@ class ScrapeStats:
         }
 
 
+class _UrlSet:
+    """Set of seen URLs, stored as 64-bit blake2b digests.
+    
+    Crawls can discover far more links than they fetch; keeping an int per
+    URL instead of the string cuts the visited set's memory several-fold.
+    A false "seen" needs a 64-bit collision, which a crawl can ignore.
+    """
+    
+    __slots__ = ("_hashes",)
+    
+    def __init__(self) -> None:
+        self._hashes: Set[int] = set()
+    
+    @staticmethod
+    def _key(url: str) -> int:
+        return int.from_bytes(hashlib.blake2b(url.encode(), digest_size=8).digest(), "little")
+    
+    def __contains__(self, url: str) -> bool:
+        return self._key(url) in self._hashes
+    
+    def add(self, url: str) -> None:
+        self._hashes.add(self._key(url))
+
+
 async def scrape_project(
     project_id: str,
     base_url: str,
@@ -84,18 +167,26 @@ async def scrape_project(
     config = read_json(config_path(project_id))
     config.update({
         "status": "scraping",
-        "startedAt": datetime.utcnow().isoformat(),
-        "updatedAt": datetime.utcnow().isoformat(),
+        "startedAt": iso_now(),
+        "updatedAt": iso_now(),
     })
     write_json(config_path(project_id), config)
 
     stats = ScrapeStats()
     
-    def update_progress(message: str) -> None:
+    def update_progress(message: str, force: bool = False) -> None:
         stats.progress = message
         config["stats"] = stats.to_dict()
-        config["updatedAt"] = datetime.utcnow().isoformat()
-        write_json(config_path(project_id), config)
+        config["updatedAt"] = iso_now()
+        now = time.monotonic()
+        if (
+            force
+            or stats.pages_fetched - stats.last_flush_count >= PROGRESS_FLUSH_PAGES
+            or now - stats.last_flush_ts >= PROGRESS_FLUSH_INTERVAL
+        ):
+            write_json(config_path(project_id), config)
+            stats.last_flush_ts = now
+            stats.last_flush_count = stats.pages_fetched
         if on_progress:
             on_progress(message)
 
@@ -112,13 +203,13 @@ async def scrape_project(
         )
         
         # Build search index
-        update_progress("Building search index...")
+        update_progress("Building search index...", force=True)
         doc_count = build_fts_index(project_id)
         
         config.update({
             "status": "ready",
             "lastError": None,
-            "completedAt": datetime.utcnow().isoformat(),
+            "completedAt": iso_now(),
         })
         stats.progress = f"Complete: {stats.pages_written} pages indexed"
         
@@ -133,7 +224,7 @@ async def scrape_project(
         
     finally:
         config["stats"] = stats.to_dict()
-        config["updatedAt"] = datetime.utcnow().isoformat()
+        config["updatedAt"] = iso_now()
         write_json(config_path(project_id), config)
     
     return stats.to_dict()
@@ -157,99 +248,164 @@ async def _crawl(
         raise ValueError("base_url must be http or https")
     
     host = parsed_base.netloc
-    queue: deque[Tuple[str, int]] = deque([(base_url, 0)])
-    visited: Set[str] = set()
+    queue: deque[Tuple[str, int]] = deque()
+    # Every URL ever queued, so each is fetched at most once
+    visited = _UrlSet()
     
     docs_folder = docs_dir(project_id)
     docs_folder.mkdir(parents=True, exist_ok=True)
     
     # Fetch robots.txt
-    robots_parser = await _fetch_robots(parsed_base.scheme, host)
+    robots_rules = await _fetch_robots(parsed_base.scheme, host)
+    
+    def enqueue(urls: Iterable[str], depth: int) -> None:
+        """Queue wanted URLs once each; rejects never reach the queue."""
+        for url in urls:
+            if robots_rules and not _check_robots(robots_rules, url):
+                continue
+            visited.add(url)
+            queue.append((url, depth))
+    
+    enqueue(_filter_urls([base_url], include_re, exclude_re, visited), 0)
+    
+    # Per-host pacing: request starts are spaced rate_limit_delay apart, so
+    # concurrent fetches overlap their latency without raising the request rate.
+    loop = asyncio.get_running_loop()
+    next_slot = loop.time()
+    
+    async def pace() -> None:
+        nonlocal next_slot
+        now = loop.time()
+        wait = next_slot - now
+        next_slot = max(now, next_slot) + settings.rate_limit_delay
+        if wait > 0:
+            await asyncio.sleep(wait)
     
-    async with httpx.AsyncClient(
-        headers={"User-Agent": settings.user_agent},
-        follow_redirects=True,
-        timeout=settings.request_timeout,
-    ) as client:
+    async def fetch(client: httpx.AsyncClient, current_url: str, depth: int) -> None:
+        on_progress(f"Fetching {stats.pages_fetched + 1}/{max_pages}: {current_url[:60]}...")
         
-        while queue and stats.pages_fetched < max_pages:
-            current_url, depth = queue.popleft()
+        try:
+            await pace()
+            response = await client.get(current_url)
+            stats.pages_fetched += 1
             
-            if current_url in visited:
-                continue
-            visited.add(current_url)
+            if response.status_code != 200:
+                stats.errors += 1
+                return
             
-            if depth > max_depth:
-                continue
+            content_type = response.headers.get("content-type", "")
+            if "text/html" not in content_type:
+                return
             
-            # Check robots.txt
-            if robots_parser and not _check_robots(robots_parser, current_url):
-                continue
+            html = response.text
+            tree = _parse_once(html)
             
-            # Apply include/exclude patterns
-            if include_re and not include_re.search(current_url):
-                continue
-            if exclude_re and exclude_re.search(current_url):
-                continue
+            # Extract and save content
+            saved = await _process_page(project_id, current_url, html, tree, docs_folder)
+            if saved:
+                stats.pages_written += 1
             
-            on_progress(f"Fetching {stats.pages_fetched + 1}/{max_pages}: {current_url[:60]}...")
+            # Extract links for crawling
+            if depth < max_depth and tree is not None:
+                enqueue(
+                    _extract_links(tree, current_url, host, visited, include_re, exclude_re),
+                    depth + 1,
+                )
             
-            try:
-                response = await client.get(current_url)
-                stats.pages_fetched += 1
-                
-                if response.status_code != 200:
-                    stats.errors += 1
-                    continue
-                
-                content_type = response.headers.get("content-type", "")
-                if "text/html" not in content_type:
-                    continue
-                
-                html = response.text
-                
-                # Extract and save content
-                saved = _process_page(project_id, current_url, html, docs_folder)
-                if saved:
-                    stats.pages_written += 1
-                
-                # Extract links for crawling
-                if depth < max_depth:
-                    links = _extract_links(html, current_url, host)
-                    for link in links:
-                        if link not in visited:
-                            queue.append((link, depth + 1))
-                
-                # Rate limiting
-                await asyncio.sleep(settings.rate_limit_delay)
-                
-            except Exception as e:
-                stats.errors += 1
-                continue
+        except Exception:
+            stats.errors += 1
+    
+    concurrency = settings.scrape_concurrency
+    in_flight: Set[asyncio.Task] = set()
+    client = _get_client()
+    
+    try:
+        while queue or in_flight:
+            # Top up the worker pool; in-flight fetches count towards max_pages
+            while (
+                queue
+                and len(in_flight) < concurrency
+                and stats.pages_fetched + len(in_flight) < max_pages
+            ):
+                current_url, depth = queue.popleft()
+                in_flight.add(asyncio.create_task(fetch(client, current_url, depth)))
+            
+            if not in_flight:
+                break
+            _, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in in_flight:
+            task.cancel()
 
 
-async def _fetch_robots(scheme: str, host: str) -> Optional[RobotFileParser]:
-    """Fetch and parse robots.txt."""
+async def _fetch_robots(scheme: str, host: str) -> Optional[RobotsRules]:
+    """Fetch and compile robots.txt, cached per (scheme, host) for ROBOTS_CACHE_TTL."""
     if settings.respect_robots_txt == "ignore":
         return None
     
+    key = (scheme, host)
+    cached = _ROBOTS_CACHE.get(key)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
+    
+    rules = None
     robots_url = f"{scheme}://{host}/robots.txt"
     try:
-        async with httpx.AsyncClient(
+        response = await _get_client().get(robots_url, timeout=5.0)
+        if response.status_code == 200:
+            rp = RobotFileParser()
+            rp.parse(response.text.splitlines())
+            rules = _compile_robots(rp, settings.user_agent)
+    except Exception:
+        # Network failures aren't cached; the next scrape retries
+        return None
+    
+    _ROBOTS_CACHE[key] = (time.monotonic() + ROBOTS_CACHE_TTL, rules)
+    return rules
+
+
+def _compile_robots(rp: RobotFileParser, user_agent: str) -> RobotsRules:
+    """Pick the robots.txt group for a user agent and order its rules for matching.
+
+    Rules are sorted longest path first, Allow before Disallow on equal
+    length, so the first prefix that matches is the most specific one
+    (RFC 9309).
+    """
+    entry = next((e for e in rp.entries if e.applies_to(user_agent)), rp.default_entry)
+    if entry is None:
+        return ()
+    rules = {(line.path, line.allowance) for line in entry.rulelines}
+    return tuple(sorted(rules, key=lambda rule: (-len(rule[0]), not rule[1])))
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Return the process-wide AsyncClient for the running event loop."""
+    global _CLIENT, _CLIENT_LOOP
+    loop = asyncio.get_running_loop()
+    if _CLIENT is None or _CLIENT.is_closed or _CLIENT_LOOP is not loop:
+        _CLIENT = httpx.AsyncClient(
             headers={"User-Agent": settings.user_agent},
             follow_redirects=True,
-        ) as client:
-            response = await client.get(robots_url, timeout=5.0)
-            if response.status_code == 200:
-                rp = RobotFileParser()
-                rp.parse(response.text.splitlines())
-                return rp
-    except Exception:
-        pass
-    return None
+            timeout=settings.request_timeout,
+            limits=httpx.Limits(
+                max_connections=100, max_keepalive_connections=50, keepalive_expiry=60
+            ),
+            # HTTP/2 needs the optional h2 package (httpx[http2])
+            http2=importlib.util.find_spec("h2") is not None,
+        )
+        _CLIENT_LOOP = loop
+    return _CLIENT
+
+
+async def close_client() -> None:
+    """Close the shared AsyncClient (call on shutdown)."""
+    global _CLIENT, _CLIENT_LOOP
+    if _CLIENT is not None:
+        await _CLIENT.aclose()
+    _CLIENT = _CLIENT_LOOP = None
 
 
-def _check_robots(robots_parser: RobotFileParser, url: str) -> bool:
+def _check_robots(robots_rules: RobotsRules, url: str) -> bool:
     """Check if URL is allowed by robots.txt."""
     if settings.respect_robots_txt == "ignore":
         return True
@@ -258,14 +414,35 @@ def _check_robots(robots_parser: RobotFileParser, url: str) -> bool:
         # Only respect crawl-delay, not disallow rules
         return True
     
-    # Strict mode
-    return robots_parser.can_fetch(settings.user_agent, url)
+    # Strict mode; paths are normalized the same way RobotFileParser
+    # normalizes rule paths
+    parsed = urlparse(unquote(url))
+    path = quote(urlunparse(("", "", parsed.path, parsed.params, parsed.query, ""))) or "/"
+    for prefix, allowed in robots_rules:
+        if path.startswith(prefix):
+            return allowed
+    return True
+
+
+def _parse_once(html: str) -> Optional[lxml.html.HtmlElement]:
+    """Parse a page once with lxml; the tree is shared by every extraction step."""
+    try:
+        return lxml.html.document_fromstring(html)
+    except ValueError:
+        # str input with an XML encoding declaration must be given as bytes
+        try:
+            return lxml.html.document_fromstring(html.encode("utf-8"))
+        except (ValueError, lxml.etree.ParserError):
+            return None
+    except lxml.etree.ParserError:
+        return None
 
 
-def _process_page(
+async def _process_page(
     project_id: str,
     url: str,
     html: str,
+    tree: Optional[lxml.html.HtmlElement],
     docs_folder,
 ) -> bool:
     """Extract content from HTML and save as Markdown."""
@@ -278,31 +455,28 @@ def _process_page(
         no_fallback=False,
     )
     
-    # Fallback to BeautifulSoup + markdownify
-    if not content or len(content) < 100:
-        soup = BeautifulSoup(html, "html.parser")
-        
-        # Remove unwanted elements
-        for tag in soup.find_all(["nav", "header", "footer", "aside", "script", "style"]):
-            tag.decompose()
-        
+    # Fallback to converting the main content element directly
+    if (not content or len(content) < 100) and tree is not None:
         # Try to find main content
-        main = soup.find("main") or soup.find("article") or soup.find("body")
-        if main:
-            content = md(str(main), strip=["script", "style"])
+        main = tree.find(".//main")
+        if main is None:
+            main = tree.find(".//article")
+        if main is None:
+            main = tree.body
+        if main is not None:
+            content = _tree_to_markdown(main)
     
     if not content or len(content.strip()) < 50:
         return False
     
     # Extract title
-    soup = BeautifulSoup(html, "html.parser")
     title = ""
-    if soup.title:
-        title = soup.title.get_text().strip()
-    if not title:
-        h1 = soup.find("h1")
-        if h1:
-            title = h1.get_text().strip()
+    if tree is not None:
+        title = (tree.findtext(".//title") or "").strip()
+        if not title:
+            h1 = tree.find(".//h1")
+            if h1 is not None:
+                title = h1.text_content().strip()
     if not title:
         title = urlparse(url).path.split("/")[-1] or "Untitled"
     
@@ -310,57 +484,214 @@ def _process_page(
     slug = _url_to_slug(url)
     filename = f"{slug}.md"
     
-    # Create Markdown with YAML frontmatter
-    frontmatter = f"""---
-title: "{title.replace('"', "'")}"
-url: "{url}"
-scraped_at: "{datetime.utcnow().isoformat()}"
----
-
-"""
-    
-    full_content = frontmatter + content.strip()
+    # YAML frontmatter; titles and URLs keep their quotes and backslashes
+    body = content.strip()
+    frontmatter = (
+        f"---\n"
+        f"title: {_yaml_quote(title)}\n"
+        f"url: {_yaml_quote(url)}\n"
+        f'scraped_at: "{iso_now()}"\n'
+        f"word_count: {len(body.split())}\n"
+        f"---\n\n"
+    )
     
-    # Save
+    # Save off the event loop so other in-flight fetches keep progressing
     filepath = docs_folder / filename
-    filepath.write_text(full_content, encoding="utf-8")
+    await asyncio.to_thread(
+        _write_page, filepath, frontmatter.encode("utf-8"), body.encode("utf-8")
+    )
     
     return True
 
 
-def _extract_links(html: str, base_url: str, host: str) -> List[str]:
-    """Extract same-host links from HTML."""
-    soup = BeautifulSoup(html, "html.parser")
-    links = []
+def _yaml_quote(value: str) -> str:
+    """Quote a string as a double-quoted YAML scalar.
     
-    for a in soup.find_all("a", href=True):
-        href = a["href"]
-        
+    JSON strings are valid YAML double-quoted scalars, but with ensure_ascii
+    json escapes non-BMP characters (emoji) as surrogate pairs, which
+    libyaml rejects. Characters are written as-is instead, and only those
+    YAML can't hold literally get a \\u escape.
+    """
+    return _YAML_UNSAFE_RE.sub(
+        lambda m: f"\\u{ord(m[0]):04x}", json.dumps(value, ensure_ascii=False)
+    )
+
+
+def _write_page(filepath, frontmatter: bytes, body: bytes) -> None:
+    """Write a page's frontmatter and body without joining them first."""
+    with open(filepath, "wb") as f:
+        f.write(frontmatter)
+        f.write(body)
+
+
+def _tree_to_markdown(root: lxml.html.HtmlElement) -> str:
+    """Convert an element to plain Markdown, skipping page chrome.
+
+    Only the structure that matters for search is kept: headings, paragraphs,
+    list items, links, tables, code blocks and line breaks. The tree is
+    walked in place, so the shared page tree is never copied or modified.
+    """
+    blocks: List[str] = []
+    inline: List[str] = []
+
+    def flush() -> None:
+        text = _LINE_WS_RE.sub("\n", "".join(inline)).strip()
+        if text and text != "-":
+            blocks.append(text)
+        inline.clear()
+
+    def add_text(text: Optional[str]) -> None:
+        if text:
+            inline.append(_WS_RE.sub(" ", text))
+
+    def walk(el: lxml.html.HtmlElement) -> None:
+        add_text(el.text)
+        for child in el:
+            tag = child.tag
+            if not isinstance(tag, str) or tag in _CHROME_TAGS:
+                # Comments, processing instructions and page chrome
+                pass
+            elif tag in _HEADING_LEVELS:
+                flush()
+                heading = _WS_RE.sub(" ", child.text_content()).strip()
+                if heading:
+                    blocks.append("#" * _HEADING_LEVELS[tag] + " " + heading)
+            elif tag == "pre":
+                flush()
+                code = child.text_content().strip("\n")
+                if code.strip():
+                    blocks.append(f"```\n{code}\n```")
+            elif tag == "br":
+                inline.append("\n")
+            elif tag == "li":
+                flush()
+                inline.append("- ")
+                walk(child)
+                flush()
+            elif tag in _BLOCK_TAGS:
+                flush()
+                walk(child)
+                flush()
+            elif tag == "table":
+                flush()
+                table = _table_to_markdown(child)
+                if table:
+                    blocks.append(table)
+            elif tag == "a":
+                start = len(inline)
+                walk(child)
+                text = "".join(inline[start:]).strip()
+                href = (child.get("href") or "").strip()
+                if text and href and not href.startswith(("#", "javascript:")):
+                    del inline[start:]
+                    inline.append(f"[{text}]({href})")
+            elif tag == "code":
+                code = child.text_content()
+                if code:
+                    inline.append(f"`{code}`")
+            else:
+                walk(child)
+            add_text(child.tail)
+
+    walk(root)
+    flush()
+    return "\n\n".join(blocks)
+
+
+def _table_to_markdown(table: lxml.html.HtmlElement) -> str:
+    """Render a table as Markdown pipe rows, the first row as the header."""
+    rows = []
+    for tr in table.xpath(_TABLE_ROWS_XPATH):
+        cells = [
+            _WS_RE.sub(" ", _tree_to_markdown(cell)).replace("|", "\\|")
+            for cell in tr.xpath("./th | ./td")
+        ]
+        if cells:
+            rows.append(cells)
+    if not rows:
+        return ""
+    
+    width = max(len(cells) for cells in rows)
+    lines = []
+    for i, cells in enumerate(rows):
+        cells += [""] * (width - len(cells))
+        lines.append("| " + " | ".join(cells) + " |")
+        if i == 0:
+            lines.append("|" + " --- |" * width)
+    return "\n".join(lines)
+
+
+def _extract_links(
+    tree: lxml.html.HtmlElement,
+    base_url: str,
+    host: str,
+    visited: Container[str],
+    include_re: Optional[re.Pattern] = None,
+    exclude_re: Optional[re.Pattern] = None,
+) -> Set[str]:
+    """Extract same-host links from a parsed page that are worth crawling.
+
+    Already-visited URLs and duplicates are dropped as they are found, so
+    only new URLs come back.
+    """
+    out: Set[str] = set()
+    origin = f"{urlparse(base_url).scheme}://{host}"
+    
+    for href in tree.xpath("//a/@href"):
         # Skip anchors, javascript, mailto, etc.
         if href.startswith(("#", "javascript:", "mailto:", "tel:")):
             continue
         
-        # Resolve relative URLs
-        full_url = urljoin(base_url, href)
-        parsed = urlparse(full_url)
+        # Fast path for "/path" and same-origin absolute links; gives the
+        # same result as the urljoin/urlparse path below
+        m = _SIMPLE_LINK_RE.match(href[len(origin):] if href.startswith(origin) else href)
+        if m is not None and "/." not in m[1]:
+            clean_url = origin + m[1]
+            if m[2]:
+                clean_url += f"?{m[2]}"
+        else:
+            # Resolve relative URLs
+            full_url = urljoin(base_url, href)
+            parsed = urlparse(full_url)
+            
+            # Only same-host links
+            if parsed.netloc != host:
+                continue
+            
+            # Remove fragments
+            clean_url = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
+            if parsed.query:
+                clean_url += f"?{parsed.query}"
         
-        # Only same-host links
-        if parsed.netloc != host:
+        if clean_url in visited or clean_url in out:
             continue
         
-        # Remove fragments
-        clean_url = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
-        if parsed.query:
-            clean_url += f"?{parsed.query}"
-        
         # Skip common non-doc URLs
-        skip_extensions = {".pdf", ".zip", ".tar", ".gz", ".exe", ".dmg", ".png", ".jpg", ".gif", ".svg"}
-        if any(clean_url.lower().endswith(ext) for ext in skip_extensions):
+        if _SKIP_EXT_RE.search(clean_url):
+            continue
+        if include_re and not include_re.search(clean_url):
+            continue
+        if exclude_re and exclude_re.search(clean_url):
             continue
         
-        links.append(clean_url)
+        out.add(clean_url)
     
-    return list(set(links))
+    return out
+
+
+def _filter_urls(
+    urls,
+    include_re: Optional[re.Pattern],
+    exclude_re: Optional[re.Pattern],
+    visited: Container[str],
+) -> List[str]:
+    """Drop already-seen URLs and those failing the include/exclude patterns."""
+    return [
+        url for url in urls
+        if url not in visited
+        and (include_re is None or include_re.search(url))
+        and not (exclude_re and exclude_re.search(url))
+    ]
 
 
 def _url_to_slug(url: str) -> str:
@@ -372,12 +703,15 @@ def _url_to_slug(url: str) -> str:
         path = "index"
     
     # Replace slashes and special chars
-    slug = re.sub(r"[^\w\-]", "-", path)
-    slug = re.sub(r"-+", "-", slug).strip("-")
+    if path.isascii():
+        slug = path.encode("ascii").translate(_SLUG_TABLE).decode("ascii")
+    else:
+        slug = _NONSLUG_RE.sub("-", path)
+    slug = _DASH_RE.sub("-", slug).strip("-")
     
     # Limit length and add hash for uniqueness
     if len(slug) > 80:
-        hash_suffix = hashlib.md5(url.encode()).hexdigest()[:8]
+        hash_suffix = hashlib.blake2b(url.encode(), digest_size=4).hexdigest()
         slug = slug[:70] + "-" + hash_suffix
     
     return slug or "page"
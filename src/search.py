@@ -0,0 +1,89 @@
+"""Cross-project search shared by the REST API, MCP server and CLI."""
+from __future__ import annotations
+
+import heapq
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Tuple
+
+from config import settings
+from fts_indexer import query_fts
+
+# Vector search (indexer only pulls in its heavy deps on first query)
+HAS_VECTORS = False
+if settings.enable_vector_index:
+    try:
+        from indexer import query_vectors
+        HAS_VECTORS = True
+    except ImportError:
+        pass
+
+# Per-project queries overlap well: sqlite releases the GIL while it runs.
+# The executor only starts threads once work is submitted.
+_SEARCH_WORKERS = 8
+_executor = ThreadPoolExecutor(max_workers=_SEARCH_WORKERS, thread_name_prefix="docsmcp-search")
+
+
+def _search_one(
+    project_id: str, query: str, limit: int, highlight: bool, vectors: bool
+) -> List[Dict[str, Any]]:
+    """Search a single project, preferring vectors and falling back to FTS."""
+    results = None
+    if vectors and HAS_VECTORS:
+        try:
+            results = query_vectors(project_id, query, limit)
+        except ImportError:
+            pass
+    if not results:
+        results = query_fts(project_id, query, limit, highlight=highlight)
+    for r in results:
+        r["project"] = project_id
+    return results
+
+
+def search_projects(
+    project_ids: List[str],
+    query: str,
+    limit: int,
+    highlight: bool = False,
+    vectors: bool = True,
+) -> List[Dict[str, Any]]:
+    """Search several projects concurrently and return the top `limit` hits.
+
+    Projects that fail to search (missing or corrupt index) are skipped.
+    """
+    if not project_ids or limit <= 0:
+        return []
+    if len(project_ids) == 1:
+        try:
+            return _search_one(project_ids[0], query, limit, highlight, vectors)[:limit]
+        except Exception:
+            return []
+
+    futures = [
+        _executor.submit(_search_one, pid, query, limit, highlight, vectors)
+        for pid in project_ids
+    ]
+
+    # Min-heap of the best `limit` hits so far; the counter breaks score ties
+    # so dicts are never compared.
+    heap: List[Tuple[float, int, Dict[str, Any]]] = []
+    seq = 0
+    for future in as_completed(futures):
+        try:
+            results = future.result()
+        except Exception:
+            continue
+        # Each project's hits arrive best-first, so once one fails to beat
+        # the current k-th best none of the rest can either.
+        for r in results:
+            score = r.get("score", 0)
+            if len(heap) < limit:
+                heapq.heappush(heap, (score, seq, r))
+            elif score > heap[0][0]:
+                heapq.heapreplace(heap, (score, seq, r))
+            else:
+                break
+            seq += 1
+
+    heap.sort(key=lambda item: (-item[0], item[1]))
+    return [r for _, _, r in heap]
@@ -4,30 +4,71 @@ Handles project directories, JSON metadata, and document files.
 """
 from __future__ import annotations
 
-import json
+import functools
+import os
+import re
+import time
+from datetime import UTC, datetime
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
 
 from config import settings
 
 
-def projects_root() -> Path:
-    """Get the root directory for all projects."""
-    root = settings.projects_dir
+# Top-level `title:` / `url:` lines inside a frontmatter block
+_FRONTMATTER_FIELD_RE = re.compile(r"^(title|url):[ \t]*(.*?)[ \t]*$", re.M)
+
+# First line starting with one or more `#`, capturing the heading text
+_HEADING_RE = re.compile(r"^[ \t]*#+[ \t]*(.*?)[ \t\r]*$", re.M)
+
+
+# (epoch second, ISO string) of the last iso_now() call
+_iso_now_cache: Tuple[int, str] = (0, "")
+
+
+def iso_now() -> str:
+    """Current UTC time as an ISO-8601 string, at one-second resolution.
+    
+    The formatted string is reused for every call within the same second.
+    """
+    global _iso_now_cache
+    t = int(time.time())
+    if t != _iso_now_cache[0]:
+        _iso_now_cache = (t, datetime.fromtimestamp(t, tz=UTC).isoformat())
+    return _iso_now_cache[1]
+
+
+# Path helpers are memoized: settings are frozen, so a project's paths never
+# change, and they no longer touch the filesystem.
+
+def ensure_projects_root() -> Path:
+    """Create the projects root directory if needed (called at startup)."""
+    root = projects_root()
     root.mkdir(parents=True, exist_ok=True)
     return root
 
 
+@functools.lru_cache(maxsize=1)
+def projects_root() -> Path:
+    """Get the root directory for all projects."""
+    return settings.projects_dir
+
+
+@functools.lru_cache(maxsize=256)
 def project_dir(project_id: str) -> Path:
     """Get the directory for a specific project."""
     return projects_root() / project_id
 
 
+@functools.lru_cache(maxsize=256)
 def config_path(project_id: str) -> Path:
     """Get the config.json path for a project."""
     return project_dir(project_id) / "config.json"
 
 
+@functools.lru_cache(maxsize=256)
 def docs_dir(project_id: str) -> Path:
     """Get the docs directory for a project."""
     return project_dir(project_id) / "docs"
@@ -48,36 +89,112 @@ def vectors_path(project_id: str) -> Path:
     return project_dir(project_id) / "vectors.index"
 
 
+# Pretty-printed like json.dump(indent=2); int keys are stringified as before
+_JSON_WRITE_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+
+
 def read_json(path: Path) -> Dict[str, Any]:
     """Read a JSON file, returning empty dict if not exists."""
-    if not path.exists():
+    try:
+        return orjson.loads(path.read_bytes())
+    except (orjson.JSONDecodeError, OSError):
         return {}
+
+
+# Project listing/stats caches, keyed on directory and config mtimes
+_projects_list_cache: Optional[Tuple[int, List[str]]] = None
+_stats_cache: Dict[str, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
+
+# (reload deadline on time.monotonic(), known project IDs) for project_exists()
+PROJECT_IDS_TTL = 30.0
+_project_ids: Optional[Tuple[float, frozenset]] = None
+
+
+@functools.lru_cache(maxsize=256)
+def _read_json_at(path: Path, mtime_ns: int, size: int) -> Dict[str, Any]:
+    return read_json(path)
+
+
+def read_json_cached(path: Path) -> Dict[str, Any]:
+    """Read a JSON file, memoized on its mtime and size.
+
+    The returned dict is shared between callers and must not be mutated;
+    use read_json() for read-modify-write.
+    """
     try:
-        with path.open("r", encoding="utf-8") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError):
+        st = path.stat()
+    except OSError:
         return {}
+    return _read_json_at(path, st.st_mtime_ns, st.st_size)
 
 
 def write_json(path: Path, data: Dict[str, Any]) -> None:
     """Write data to a JSON file, creating parent directories."""
     path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, default=str)
+    path.write_bytes(orjson.dumps(data, default=str, option=_JSON_WRITE_OPTIONS))
+    # Writes can land within the filesystem's timestamp granularity
+    invalidate_project_cache()
+
+
+def invalidate_project_cache() -> None:
+    """Forget cached project listings, stats and JSON reads."""
+    global _projects_list_cache, _project_ids
+    _projects_list_cache = None
+    _project_ids = None
+    _stats_cache.clear()
+    _read_json_at.cache_clear()
+
+
+def markdown_files(folder: Path) -> List[str]:
+    """Return sorted paths of the regular *.md files directly inside folder.
+    
+    Uses os.scandir so the file type comes from the directory listing
+    instead of a stat per entry.
+    """
+    with os.scandir(folder) as it:
+        return sorted(
+            e.path for e in it
+            if e.name.endswith(".md") and e.is_file(follow_symlinks=False)
+        )
 
 
 def list_projects() -> list[str]:
-    """List all project IDs."""
+    """List all project IDs.
+    
+    The listing is cached until the projects directory's mtime changes or
+    invalidate_project_cache() is called.
+    """
+    global _projects_list_cache
     root = projects_root()
-    return [
+    try:
+        mtime_ns = root.stat().st_mtime_ns
+    except FileNotFoundError:
+        return []
+    cached = _projects_list_cache
+    if cached is not None and cached[0] == mtime_ns:
+        return list(cached[1])
+    
+    ids = [
         d.name for d in root.iterdir()
         if d.is_dir() and (d / "config.json").exists()
     ]
+    _projects_list_cache = (mtime_ns, ids)
+    return list(ids)
 
 
 def project_exists(project_id: str) -> bool:
-    """Check if a project exists."""
-    return config_path(project_id).exists()
+    """Check if a project exists.
+    
+    Known IDs are answered from a set that is reloaded from disk every
+    PROJECT_IDS_TTL seconds (sooner after invalidate_project_cache());
+    unknown IDs still hit the disk so new projects are seen immediately.
+    """
+    global _project_ids
+    now = time.monotonic()
+    cached = _project_ids
+    if cached is None or now >= cached[0]:
+        cached = _project_ids = (now + PROJECT_IDS_TTL, frozenset(list_projects()))
+    return project_id in cached[1] or config_path(project_id).exists()
 
 
 def delete_project(project_id: str) -> bool:
@@ -88,6 +205,7 @@ def delete_project(project_id: str) -> bool:
     
     import shutil
     shutil.rmtree(proj_dir)
+    invalidate_project_cache()
     return True
 
 
@@ -104,9 +222,8 @@ def get_project_stats(project_id: str) -> Dict[str, Any]:
     for md_file in docs.glob("*.md"):
         page_count += 1
         try:
-            content = md_file.read_text(encoding="utf-8", errors="ignore")
-            total_words += len(content.split())
-        except IOError:
+            total_words += _word_count(md_file)
+        except OSError:
             pass
     
     fts_db = fts_db_path(project_id)
@@ -124,6 +241,149 @@ def get_project_stats(project_id: str) -> Dict[str, Any]:
     }
 
 
+def get_project_stats_cached(project_id: str) -> Dict[str, Any]:
+    """get_project_stats(), memoized on the docs directory and config mtimes.
+    
+    Adding or removing pages changes the docs directory; every scrape ends
+    by updating config.json. The returned dict is shared and must not be
+    mutated.
+    """
+    try:
+        key = (
+            docs_dir(project_id).stat().st_mtime_ns,
+            config_path(project_id).stat().st_mtime_ns,
+        )
+    except OSError:
+        return get_project_stats(project_id)
+    
+    cached = _stats_cache.get(project_id)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    
+    stats = get_project_stats(project_id)
+    _stats_cache[project_id] = (key, stats)
+    return stats
+
+
+def _unquote_scalar(raw: str) -> Optional[str]:
+    """Decode a single-line YAML scalar, or None if it needs a real parser."""
+    if raw.startswith('"'):
+        if len(raw) < 2 or not raw.endswith('"'):
+            return None
+        if "\\" not in raw:
+            return raw[1:-1]
+        # Escaped double-quoted scalars use JSON-compatible escapes
+        try:
+            return orjson.loads(raw)
+        except ValueError:
+            return None
+    if raw.startswith("'"):
+        if len(raw) < 2 or not raw.endswith("'"):
+            return None
+        return raw[1:-1].replace("''", "'")
+    if raw[:1] in ("[", "{", "|", ">", "&", "*", "!") or " #" in raw:
+        return None
+    return raw
+
+
+def first_heading(text: str) -> Optional[str]:
+    """Return the text of the first Markdown heading in text, or None."""
+    m = _HEADING_RE.search(text)
+    return m.group(1) if m else None
+
+
+def _yaml_safe_load(text):
+    """yaml.safe_load, using libyaml's C loader when PyYAML was built with it."""
+    import yaml
+    return yaml.load(text, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+
+
+def parse_frontmatter(text: str) -> Tuple[Dict[str, Any], str]:
+    """Split a Markdown document into (frontmatter, body).
+
+    Only `title` and `url` are extracted, using a line scanner instead of a
+    full YAML parse. Headers the scanner can't decode fall back to PyYAML.
+    Documents without frontmatter return an empty dict and the text as-is.
+    """
+    if not text.startswith("---"):
+        return {}, text
+    end = text.find("\n---", 3)
+    if end == -1:
+        return {}, text
+    
+    header = text[3:end]
+    body = text[end + 4:]
+    
+    fields: Dict[str, Any] = {}
+    for key, raw in _FRONTMATTER_FIELD_RE.findall(header):
+        value = _unquote_scalar(raw)
+        if value is None:
+            try:
+                fm = _yaml_safe_load(header)
+            except Exception:
+                return {}, body
+            return (fm if isinstance(fm, dict) else {}), body
+        fields[key] = value
+    
+    return fields, body
+
+
+def read_document_meta(path: Path) -> Tuple[Dict[str, Any], int]:
+    """Parse just the YAML frontmatter of a Markdown file.
+    
+    Returns (frontmatter, byte offset of the body). Usually only the first
+    4 KiB of the file is read; files without frontmatter return ({}, 0).
+    """
+    with path.open("rb") as f:
+        head = f.read(4096)
+        if not head.startswith(b"---"):
+            return {}, 0
+        end = head.find(b"\n---", 3)
+        if end == -1:
+            head += f.read()
+            end = head.find(b"\n---", 3)
+            if end == -1:
+                return {}, 0
+    
+    try:
+        fm = _yaml_safe_load(head[3:end].decode("utf-8", errors="ignore"))
+    except Exception:
+        fm = None
+    return (fm if isinstance(fm, dict) else {}), end + 4
+
+
+def _count_words_fast(path: Path, offset: int = 0) -> int:
+    """Count whitespace-separated words in a file from offset, 64 KiB at a time."""
+    count = 0
+    in_word = False
+    with path.open("rb") as f:
+        f.seek(offset)
+        while chunk := f.read(65536):
+            count += len(chunk.split())
+            # A word split across the chunk boundary was counted twice
+            if in_word and not chunk[:1].isspace():
+                count -= 1
+            in_word = not chunk[-1:].isspace()
+    return count
+
+
+def _word_count(md_file: Path, fm: Optional[Dict[str, Any]] = None, body_start: int = 0) -> int:
+    """Body word count, from the scraper's `word_count` frontmatter if present."""
+    if fm is None:
+        fm, body_start = read_document_meta(md_file)
+    count = fm.get("word_count")
+    if isinstance(count, int):
+        return count
+    return _count_words_fast(md_file, body_start)
+
+
+def read_document_content(path: Path, offset: int = 0) -> str:
+    """Read a document's body, starting at the byte offset from read_document_meta()."""
+    with path.open("rb") as f:
+        f.seek(offset)
+        return f.read().decode("utf-8", errors="ignore").strip()
+
+
 def read_document(project_id: str, doc_path: str) -> Optional[Dict[str, Any]]:
     """Read a document and its metadata."""
     full_path = docs_dir(project_id) / doc_path
@@ -131,36 +391,19 @@ def read_document(project_id: str, doc_path: str) -> Optional[Dict[str, Any]]:
         return None
     
     try:
-        content = full_path.read_text(encoding="utf-8", errors="ignore")
-    except IOError:
+        metadata, body_start = read_document_meta(full_path)
+        content = read_document_content(full_path, body_start)
+    except OSError:
         return None
     
-    # Parse YAML frontmatter if present
-    title = doc_path
-    url = ""
-    metadata = {}
-    
-    if content.startswith("---"):
-        parts = content.split("---", 2)
-        if len(parts) >= 3:
-            import yaml
-            try:
-                fm = yaml.safe_load(parts[1])
-                if fm:
-                    title = fm.get("title", doc_path)
-                    url = fm.get("url", "")
-                    metadata = fm
-                content = parts[2].strip()
-            except Exception:
-                pass
+    title = metadata.get("title", doc_path)
+    url = metadata.get("url", "")
     
     # Fallback title extraction
     if title == doc_path:
-        for line in content.splitlines():
-            line = line.strip()
-            if line.startswith("#"):
-                title = line.lstrip("# ").strip()
-                break
+        heading = first_heading(content)
+        if heading is not None:
+            title = heading
     
     return {
         "path": doc_path,
@@ -171,6 +414,28 @@ def read_document(project_id: str, doc_path: str) -> Optional[Dict[str, Any]]:
     }
 
 
+def _document_summary(md_file: Path) -> Optional[Dict[str, Any]]:
+    """Listing entry for a document, read from its frontmatter where possible."""
+    try:
+        fm, body_start = read_document_meta(md_file)
+        title = fm.get("title") or md_file.name
+        if title == md_file.name:
+            heading = first_heading(read_document_content(md_file, body_start))
+            if heading is not None:
+                title = heading
+        word_count = _word_count(md_file, fm, body_start)
+    except OSError:
+        return None
+    
+    return {
+        "path": md_file.name,
+        "title": title,
+        "url": fm.get("url", ""),
+        "word_count": word_count,
+        "scraped_at": fm.get("scraped_at"),
+    }
+
+
 def list_documents(project_id: str, page: int = 1, limit: int = 50) -> Dict[str, Any]:
     """List documents with pagination."""
     docs = docs_dir(project_id)
@@ -187,15 +452,9 @@ def list_documents(project_id: str, page: int = 1, limit: int = 50) -> Dict[str,
     
     documents = []
     for md_file in page_docs:
-        doc = read_document(project_id, md_file.name)
-        if doc:
-            documents.append({
-                "path": doc["path"],
-                "title": doc["title"],
-                "url": doc["url"],
-                "word_count": len(doc["content"].split()),
-                "scraped_at": doc["metadata"].get("scraped_at"),
-            })
+        summary = _document_summary(md_file)
+        if summary:
+            documents.append(summary)
     
     return {
         "documents": documents,
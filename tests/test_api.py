@@ -57,3 +57,83 @@ def test_mcp_endpoint_list_tools(client):
     assert response.status_code == 200
     data = response.json()
     assert "result" in data or "error" in data
+
+
+def test_mcp_endpoint_rejects_non_object_params(client):
+    """Test params that are not an object get a JSON-RPC invalid params error."""
+    response = client.post("/mcp", json={
+        "jsonrpc": "2.0",
+        "id": 2,
+        "method": "list_projects",
+        "params": ["docs"],
+    })
+    assert response.status_code == 200
+    assert response.json()["error"]["code"] == -32602
+
+
+def test_rate_limit_burst(client):
+    """Test a client gets exactly RATE_LIMIT_REQUESTS requests before a 429."""
+    from src.main import rate_limit_buckets, settings
+    
+    rate_limit_buckets.clear()
+    try:
+        for i in range(settings.rate_limit_requests):
+            response = client.get("/api/stats")
+            assert response.status_code == 200
+            assert response.headers["X-RateLimit-Remaining"] == str(settings.rate_limit_requests - i - 1)
+        assert client.get("/api/stats").status_code == 429
+    finally:
+        rate_limit_buckets.clear()
+
+
+def test_preflight_skips_rate_limit(client):
+    """Test CORS preflights are answered without touching the rate limiter."""
+    from src.main import rate_limit_buckets
+    
+    rate_limit_buckets.clear()
+    response = client.options(
+        "/api/stats",
+        headers={"Origin": "https://example.com", "Access-Control-Request-Method": "GET"},
+    )
+    assert response.status_code == 200
+    assert "X-RateLimit-Remaining" not in response.headers
+    assert len(rate_limit_buckets) == 0
+
+
+def test_bucket_store_is_bounded():
+    """Test the rate-limit store evicts LRU entries and sweeps expired ones."""
+    from src.main import BucketStore
+    
+    store = BucketStore(maxsize=2)
+    store["a"] = 10.0
+    store["b"] = 20.0
+    store["a"] = 11.0  # refreshes "a"
+    store["c"] = 30.0
+    
+    assert len(store) == 2
+    assert store.get("b", -1.0) == -1.0
+    assert store.sweep(now=15.0) == 1
+    assert store.get("c", -1.0) == 30.0
+
+
+def test_list_projects_cache_invalidation(client, sample_project_config):
+    """Test project listings pick up creates and deletes without a restart."""
+    project = {**sample_project_config, "name": "cache-invalidation-test"}
+    client.delete(f"/api/projects/{project['name']}")
+    
+    before = {p["id"] for p in client.get("/api/projects").json()}
+    client.post("/api/projects", json=project)
+    assert {p["id"] for p in client.get("/api/projects").json()} == before | {project["name"]}
+    
+    client.delete(f"/api/projects/{project['name']}")
+    assert {p["id"] for p in client.get("/api/projects").json()} == before - {project["name"]}
+
+
+def test_web_ui_etag(client):
+    """Test the dashboard is served with an ETag and revalidates to 304."""
+    response = client.get("/")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    
+    response = client.get("/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
@@ -1,10 +1,11 @@
 """Tests for FTS indexer."""
 
+import sqlite3
 from pathlib import Path
 
 import pytest
 
-from src.fts_indexer import build_fts_index, get_fts_stats, query_fts
+from src.fts_indexer import build_fts_index, delete_fts_index, get_fts_stats, query_fts
 
 
 def test_build_fts_index(temp_data_dir: Path, sample_documents: list[dict]):
@@ -85,3 +86,163 @@ def test_get_fts_stats(temp_data_dir: Path, sample_documents: list[dict]):
     
     assert stats is not None
     assert stats.get("document_count", 0) == len(sample_documents)
+
+
+def test_query_fts_uses_frontmatter_metadata(temp_data_dir: Path):
+    """Test title and url are taken from YAML frontmatter when present."""
+    docs_dir = temp_data_dir / "test-project" / "docs"
+    docs_dir.mkdir(parents=True)
+    (docs_dir / "hooks.md").write_text(
+        '---\ntitle: "Hooks \\"Reference\\""\nurl: "https://example.com/hooks"\n'
+        'scraped_at: "2024-01-01T00:00:00"\n---\n\n# Ignored Heading\n\nuseState returns a pair.'
+    )
+    
+    build_fts_index("test-project", str(temp_data_dir))
+    results = query_fts("test-project", "useState", str(temp_data_dir))
+    
+    assert len(results) == 1
+    assert results[0]["title"] == 'Hooks "Reference"'
+    assert results[0]["url"] == "https://example.com/hooks"
+
+
+def test_build_fts_index_parallel_parse(temp_data_dir: Path, sample_documents: list[dict], monkeypatch):
+    """Test the process-pool parse path indexes every document."""
+    import src.fts_indexer as fts_indexer
+    
+    monkeypatch.setattr(fts_indexer, "_PARALLEL_PARSE_MIN_FILES", 1)
+    docs_dir = temp_data_dir / "test-project" / "docs"
+    docs_dir.mkdir(parents=True)
+    for doc in sample_documents:
+        (docs_dir / f"{doc['id']}.md").write_text(f"# {doc['title']}\n\n{doc['content']}")
+    
+    count = build_fts_index("test-project", str(temp_data_dir))
+    
+    assert count == len(sample_documents)
+    results = query_fts("test-project", "OAuth2", str(temp_data_dir))
+    assert [r["title"] for r in results] == ["Authentication Guide"]
+
+
+def test_query_fts_ranks_title_matches_first(temp_data_dir: Path):
+    """Test a title match outranks a document that only mentions the term in its body."""
+    docs_dir = temp_data_dir / "test-project" / "docs"
+    docs_dir.mkdir(parents=True)
+    (docs_dir / "a.md").write_text("# Routing\n\nMiddleware, middleware and more middleware.")
+    (docs_dir / "b.md").write_text("# Middleware\n\nRegister handlers that run around every incoming request.")
+    
+    build_fts_index("test-project", str(temp_data_dir))
+    results = query_fts("test-project", "middleware", str(temp_data_dir))
+    
+    assert [r["path"] for r in results] == ["b.md", "a.md"]
+
+
+def test_query_fts_after_delete_and_rebuild(temp_data_dir: Path):
+    """Test a cached connection is not reused once the index file is replaced."""
+    docs_dir = temp_data_dir / "test-project" / "docs"
+    docs_dir.mkdir(parents=True)
+    (docs_dir / "a.md").write_text("# Alpha\n\nfirst version")
+    build_fts_index("test-project", str(temp_data_dir))
+    assert len(query_fts("test-project", "first", str(temp_data_dir))) == 1
+    
+    delete_fts_index("test-project", str(temp_data_dir))
+    assert query_fts("test-project", "first", str(temp_data_dir)) == []
+    
+    (docs_dir / "a.md").write_text("# Alpha\n\nsecond version")
+    build_fts_index("test-project", str(temp_data_dir))
+    assert query_fts("test-project", "first", str(temp_data_dir)) == []
+    assert len(query_fts("test-project", "second", str(temp_data_dir))) == 1
+
+
+def test_query_fts_highlight(temp_data_dir: Path):
+    """Test snippets carry <mark> tags only when highlighting is requested."""
+    docs_dir = temp_data_dir / "test-project" / "docs"
+    docs_dir.mkdir(parents=True)
+    (docs_dir / "a.md").write_text("# Hooks\n\nuseState returns a pair.")
+    build_fts_index("test-project", str(temp_data_dir))
+    
+    plain = query_fts("test-project", "useState", str(temp_data_dir))
+    marked = query_fts("test-project", "useState", base_dir=str(temp_data_dir), highlight=True)
+    
+    assert "<mark>" not in plain[0]["snippet"]
+    assert "<mark>useState</mark>" in marked[0]["snippet"]
+
+
+def test_build_fts_index_incremental(temp_data_dir: Path, monkeypatch):
+    """Test a rebuild only re-reads changed files and drops deleted ones."""
+    import os
+    import src.fts_indexer as fts_indexer
+    
+    docs_dir = temp_data_dir / "test-project" / "docs"
+    docs_dir.mkdir(parents=True)
+    for name in ("a", "b", "c"):
+        (docs_dir / f"{name}.md").write_text(f"# {name.upper()}\n\noriginal {name}")
+    assert build_fts_index("test-project", str(temp_data_dir)) == 3
+    
+    parsed = []
+    parse_md = fts_indexer._parse_md
+    monkeypatch.setattr(fts_indexer, "_parse_md", lambda md: parsed.append(md) or parse_md(md))
+    
+    (docs_dir / "b.md").write_text("# B\n\nrewritten b")
+    st = (docs_dir / "b.md").stat()
+    os.utime(docs_dir / "b.md", ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    (docs_dir / "c.md").unlink()
+    (docs_dir / "d.md").write_text("# D\n\nbrand new d")
+    
+    assert build_fts_index("test-project", str(temp_data_dir)) == 3
+    assert sorted(os.path.basename(p) for p in parsed) == ["b.md", "d.md"]
+    
+    def search(q):
+        return [r["path"] for r in query_fts("test-project", q, str(temp_data_dir))]
+    
+    assert search("original") == ["a.md"]
+    assert search("rewritten") == ["b.md"]
+    assert search("brand") == ["d.md"]
+
+
+def test_query_fts_cache(temp_data_dir: Path, monkeypatch):
+    """Test repeated queries are served from cache until the index changes."""
+    import src.fts_indexer as fts_indexer
+    
+    docs_dir = temp_data_dir / "test-project" / "docs"
+    docs_dir.mkdir(parents=True)
+    (docs_dir / "a.md").write_text("# Alpha\n\ncached term")
+    build_fts_index("test-project", str(temp_data_dir))
+    
+    calls = []
+    run_query = fts_indexer._run_query
+    monkeypatch.setattr(fts_indexer, "_run_query", lambda *a: calls.append(a) or run_query(*a))
+    
+    first = query_fts("test-project", "cached", str(temp_data_dir))
+    first[0]["project"] = "mutated"
+    second = query_fts("test-project", "cached", str(temp_data_dir))
+    assert len(calls) == 1
+    assert "project" not in second[0]
+    
+    # Another process would only see the shared query_cache table
+    fts_indexer._QUERY_CACHE.clear()
+    assert query_fts("test-project", "cached", str(temp_data_dir)) == second
+    assert len(calls) == 1
+    
+    # The shared cache is a sidecar file; searches never write to the index
+    assert (temp_data_dir / "query_cache.db").exists()
+    index = sqlite3.connect(temp_data_dir / "test-project" / "fts_index.db")
+    tables = {row[0] for row in index.execute("SELECT name FROM sqlite_master")}
+    index.close()
+    assert "query_cache" not in tables
+    
+    (docs_dir / "b.md").write_text("# Beta\n\nanother cached term")
+    build_fts_index("test-project", str(temp_data_dir))
+    assert len(query_fts("test-project", "cached", str(temp_data_dir))) == 2
+    assert len(calls) == 2
+
+
+def test_query_fts_cache_cleared_when_docs_emptied(temp_data_dir: Path):
+    """Test cached hits are dropped once every document is deleted and reindexed."""
+    docs_dir = temp_data_dir / "test-project" / "docs"
+    docs_dir.mkdir(parents=True)
+    (docs_dir / "a.md").write_text("# Alpha\n\nephemeral term")
+    build_fts_index("test-project", str(temp_data_dir))
+    assert len(query_fts("test-project", "ephemeral", str(temp_data_dir))) == 1
+    
+    (docs_dir / "a.md").unlink()
+    assert build_fts_index("test-project", str(temp_data_dir)) == 0
+    assert query_fts("test-project", "ephemeral", str(temp_data_dir)) == []
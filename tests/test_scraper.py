@@ -0,0 +1,44 @@
+"""Tests for scraper page processing."""
+
+from pathlib import Path
+
+from src.scraper import _parse_once, _process_page, _tree_to_markdown
+from src.storage import _document_summary, read_document_meta
+
+
+async def test_process_page_frontmatter_round_trips_non_bmp(temp_data_dir: Path):
+    """Titles with emoji, quotes and backslashes survive the frontmatter round trip."""
+    title = 'Rocket \U0001F680 "launch" \\ guide é'
+    url = 'https://example.com/docs/rocket?q="1"'
+    html = (
+        f"<html><head><title>{title}</title></head>"
+        f"<body><main><h1>Launch</h1><p>{'liftoff ' * 40}</p></main></body></html>"
+    )
+
+    assert await _process_page("test-project", url, html, _parse_once(html), temp_data_dir)
+
+    md_file = next(temp_data_dir.glob("*.md"))
+    fm, _ = read_document_meta(md_file)
+    assert fm["title"] == title
+    assert fm["url"] == url
+    assert fm["word_count"] > 0
+
+    summary = _document_summary(md_file)
+    assert summary["title"] == title
+    assert summary["url"] == url
+    assert summary["scraped_at"]
+
+
+def test_tree_to_markdown_keeps_tables_and_links():
+    """Table cells stay separate and anchors keep their targets."""
+    html = (
+        "<html><body><main>"
+        '<p>Read <a href="/guide">the <b>docs</b></a> or jump <a href="#top">up</a>.</p>'
+        "<table><tr><th>Name</th><th>Type</th></tr>"
+        "<tr><td>id</td><td>int | None</td></tr></table>"
+        "</main></body></html>"
+    )
+    markdown = _tree_to_markdown(_parse_once(html).find(".//main"))
+
+    assert "Read [the docs](/guide) or jump up." in markdown
+    assert "| Name | Type |\n| --- | --- |\n| id | int \\| None |" in markdown
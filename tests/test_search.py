@@ -0,0 +1,16 @@
+"""Tests for cross-project search merging."""
+
+from src import search
+
+
+def test_search_projects_merges_top_k(monkeypatch):
+    """Results from several projects are merged best-first and capped at limit."""
+    scores = {"a": [9.0, 5.0, 1.0], "b": [7.0, 6.0, 2.0], "c": []}
+
+    def fake_search_one(project_id, query, limit, highlight, vectors):
+        return [{"project": project_id, "score": s} for s in scores[project_id][:limit]]
+
+    monkeypatch.setattr(search, "_search_one", fake_search_one)
+
+    results = search.search_projects(["a", "b", "c"], "q", 3)
+    assert [(r["project"], r["score"]) for r in results] == [("a", 9.0), ("b", 7.0), ("b", 6.0)]